@@ -3,12 +3,16 @@ Enhanced API Client with improved error handling, rate limiting, and multiple UR
 """
 import asyncio
 import aiohttp
+import math
 import time
 import random
 import logging
-from typing import Dict, Any, Optional, List
-from dataclasses import dataclass
-from datetime import datetime, timedelta
+from collections import deque, OrderedDict
+from email.utils import parsedate_to_datetime
+from urllib.parse import quote
+from typing import Dict, Any, Optional, List, Tuple, Callable
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta, timezone
 import json
 
 from config import Config
@@ -25,6 +29,76 @@ class APIResponse:
     proxy_used: Optional[str] = None
     response_time: float = 0.0
     api_url: Optional[str] = None
+    from_cache: bool = False
+    cache_age: float = 0.0  # seconds since the cached answer was fetched
+    probe: bool = False  # existence check only: 'ok' data carries no profile fields
+    headers: Dict[str, str] = field(default_factory=dict)
+    retry_after: Optional[float] = None  # set on transient failures when the caller retries itself
+
+class ProfileCache:
+    """Bounded LRU cache of normalized profile answers with per-status TTLs"""
+    
+    def __init__(self, max_size: int = 1000):
+        self.max_size = max_size
+        self.entries: OrderedDict = OrderedDict()  # username -> (APIResponse, monotonic fetch time)
+        self.stats = {'hits': 0, 'stale_hits': 0, 'misses': 0}
+    
+    def _get_ttl(self, response: APIResponse) -> float:
+        """Get how long an answer stays fresh"""
+        if response.data.get('st') == 'not_found':
+            return Config.PROFILE_CACHE_NOT_FOUND_TTL
+        return Config.PROFILE_CACHE_TTL
+    
+    def put(self, username: str, response: APIResponse):
+        """Cache an authoritative answer (found or not found); errors are never cached.
+
+        A probe hit has no profile to cache, but it confirms the account still exists, so it
+        renews a cached full profile. Monitor probes thus keep watched accounts cached; their
+        counts are as old as the monitor's last full fetch (MONITOR_FULL_PROFILE_MAX_AGE at most).
+        """
+        if self.max_size <= 0 or response.data.get('st') not in ('ok', 'not_found'):
+            return
+        if response.probe and response.data.get('st') == 'ok':
+            entry = self.entries.get(username)
+            if entry and entry[0].data.get('st') == 'ok':
+                self.entries[username] = (entry[0], time.monotonic())
+                self.entries.move_to_end(username)
+            return
+        
+        self.entries[username] = (response, time.monotonic())
+        self.entries.move_to_end(username)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+    
+    def get(self, username: str, allow_stale: bool = False) -> Optional[APIResponse]:
+        """Get a cached answer, marked as cached, or None if missing or too old"""
+        entry = self.entries.get(username)
+        if entry is None:
+            self.stats['misses'] += 1
+            return None
+        
+        response, fetched_at = entry
+        age = time.monotonic() - fetched_at
+        ttl = self._get_ttl(response)
+        if age > ttl + Config.PROFILE_CACHE_STALE_TTL:
+            del self.entries[username]
+            self.stats['misses'] += 1
+            return None
+        if age > ttl and not allow_stale:
+            self.stats['misses'] += 1
+            return None
+        
+        self.entries.move_to_end(username)
+        self.stats['stale_hits' if age > ttl else 'hits'] += 1
+        return replace(response, data=dict(response.data), from_cache=True, cache_age=age)
+    
+    def is_fresh(self, response: APIResponse) -> bool:
+        """Check whether a cached answer is still within its TTL"""
+        return response.cache_age <= self._get_ttl(response)
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Get hit/miss counters and the current size"""
+        return {**self.stats, 'size': len(self.entries)}
 
 class APIURLManager:
     """Manages multiple API URLs with health tracking and rotation"""
@@ -41,78 +115,174 @@ class APIURLManager:
             'last_success': None,
             'last_failure': None,
             'consecutive_failures': 0,
-            'is_active': True
+            'is_active': True,  # circuit closed
+            'circuit_state': 'closed',  # 'closed', 'open' or 'half_open'
+            'open_count': 0,  # trips since the circuit was last closed
+            'next_probe_at': 0.0,  # monotonic time the next half-open probe may go out
+            'ewma_latency': None,  # time-decayed latency, failures count as API_TIMEOUT
+            'ewma_updated': 0.0,
+            'in_flight': 0,
+            'recent_response_times': deque(maxlen=Config.API_LATENCY_SAMPLES)
         } for url in self.urls}
     
-    def get_next_url(self) -> str:
-        """Get next URL based on rotation strategy"""
+    def _circuit_allows(self, url: str, now: float) -> bool:
+        """Check whether a URL may take a request: closed, or due for a half-open probe"""
+        stats = self.url_stats[url]
+        return stats['circuit_state'] == 'closed' or now >= stats['next_probe_at']
+    
+    def _get_available_urls(self) -> List[str]:
+        """Get the URLs whose circuit lets a request through"""
+        now = time.monotonic()
+        return [url for url in self.urls if self._circuit_allows(url, now)]
+    
+    def _claim(self, url: str) -> str:
+        """Take a selected URL; for an open circuit this sends its half-open probe"""
+        stats = self.url_stats[url]
+        if stats['circuit_state'] != 'closed':
+            if stats['circuit_state'] == 'open':
+                logger.info(f"API URL {url} circuit half-open, probing")
+            stats['circuit_state'] = 'half_open'
+            # One probe per interval; an unanswered (cancelled) probe is replaced after it
+            stats['next_probe_at'] = time.monotonic() + Config.API_CIRCUIT_PROBE_INTERVAL
+        return url
+    
+    def _open_circuit(self, url: str):
+        """Stop sending to a URL, for twice as long as last time if it is still failing"""
+        stats = self.url_stats[url]
+        stats['open_count'] += 1
+        open_for = min(
+            Config.API_CIRCUIT_MAX_OPEN_SECONDS,
+            Config.API_CIRCUIT_OPEN_SECONDS * (2 ** (stats['open_count'] - 1))
+        )
+        stats['circuit_state'] = 'open'
+        stats['is_active'] = False
+        stats['next_probe_at'] = time.monotonic() + open_for
+        logger.warning(f"API URL {url} circuit open for {open_for:.0f}s after {stats['consecutive_failures']} consecutive failures")
+    
+    def get_next_url(self, preferred: Optional[str] = None) -> Optional[str]:
+        """Get next URL based on rotation strategy, or None while every circuit is open.
+
+        A preferred URL (a proxy's sticky endpoint) is kept while its circuit is closed.
+        """
+        if preferred in self.url_stats and self.url_stats[preferred]['circuit_state'] == 'closed':
+            return preferred
         if self.strategy == 'round_robin':
             return self._round_robin()
         elif self.strategy == 'random':
             return self._random_selection()
         elif self.strategy == 'health_based':
             return self._health_based_selection()
+        elif self.strategy == 'p2c':
+            return self._p2c_selection()
         else:
             return self.urls[0]
     
-    def _round_robin(self) -> str:
+    def _round_robin(self) -> Optional[str]:
         """Simple round-robin selection"""
-        active_urls = [url for url in self.urls if self.url_stats[url]['is_active']]
+        active_urls = self._get_available_urls()
         if not active_urls:
-            # Reset all URLs if none are active
-            for url in self.urls:
-                self.url_stats[url]['is_active'] = True
-            active_urls = self.urls
+            return None
         
         if self.current_index >= len(active_urls):
             self.current_index = 0
         
         url = active_urls[self.current_index]
         self.current_index = (self.current_index + 1) % len(active_urls)
-        return url
+        return self._claim(url)
     
-    def _random_selection(self) -> str:
+    def _random_selection(self) -> Optional[str]:
         """Random selection from active URLs"""
-        active_urls = [url for url in self.urls if self.url_stats[url]['is_active']]
+        active_urls = self._get_available_urls()
         if not active_urls:
-            for url in self.urls:
-                self.url_stats[url]['is_active'] = True
-            active_urls = self.urls
+            return None
+        
+        return self._claim(random.choice(active_urls))
+    
+    def _calculate_score(self, url: str) -> float:
+        """Calculate health score for a URL (success rate and response time)"""
+        stats = self.url_stats[url]
+        success = stats['success_count']
+        failure = stats['failure_count']
+        total = success + failure
+        
+        if total == 0:
+            return 0.5  # Neutral score for untested URLs
+        
+        success_rate = success / total
+        avg_time = stats['avg_response_time']
+        
+        # Penalize for consecutive failures
+        consecutive_penalty = min(stats['consecutive_failures'] * 0.1, 0.5)
+        
+        # Score: 70% success rate, 20% response time, 10% consecutive failures
+        score = (success_rate * 0.7) - (min(avg_time / 10.0, 0.2)) - consecutive_penalty
+        return max(0, score)
+    
+    def _load_cost(self, url: str) -> float:
+        """Expected wait at a URL: decayed latency times the requests already queued on it"""
+        stats = self.url_stats[url]
+        latency = stats['ewma_latency']
+        if latency is None:
+            latency = Config.API_LATENCY_DEFAULT
+        return latency * (stats['in_flight'] + 1)
+    
+    def _p2c_selection(self) -> Optional[str]:
+        """Power of two choices: sample two usable URLs and take the one with the lower load cost"""
+        now = time.monotonic()
+        picks = []
+        for _ in range(4):
+            url = random.choice(self.urls)
+            if url not in picks and self._circuit_allows(url, now):
+                picks.append(url)
+                if len(picks) == 2:
+                    break
+        
+        if not picks:
+            # Most circuits are open: fall back to a scan of the few that are left
+            active_urls = self._get_available_urls()
+            if not active_urls:
+                return None
+            picks = random.sample(active_urls, min(2, len(active_urls)))
         
-        return random.choice(active_urls)
+        return self._claim(min(picks, key=self._load_cost))
     
-    def _health_based_selection(self) -> str:
+    def _record_latency(self, url: str, sample: float):
+        """Fold a latency sample into the URL's EWMA, weighting by the time since the last one"""
+        stats = self.url_stats[url]
+        now = time.monotonic()
+        if stats['ewma_latency'] is None:
+            stats['ewma_latency'] = sample
+        else:
+            weight = math.exp(-(now - stats['ewma_updated']) / Config.API_LATENCY_DECAY_SECONDS)
+            stats['ewma_latency'] = stats['ewma_latency'] * weight + sample * (1 - weight)
+        stats['ewma_updated'] = now
+    
+    def begin_request(self, url: str):
+        """Count a request as in flight on a URL"""
+        if url in self.url_stats:
+            self.url_stats[url]['in_flight'] += 1
+    
+    def end_request(self, url: str):
+        """Count a request as finished on a URL"""
+        if url in self.url_stats:
+            self.url_stats[url]['in_flight'] = max(0, self.url_stats[url]['in_flight'] - 1)
+    
+    def _health_based_selection(self) -> Optional[str]:
         """Select URL based on health score (success rate and response time)"""
-        active_urls = [url for url in self.urls if self.url_stats[url]['is_active']]
+        active_urls = self._get_available_urls()
         if not active_urls:
-            for url in self.urls:
-                self.url_stats[url]['is_active'] = True
-            active_urls = self.urls
+            return None
         
-        def calculate_score(url):
-            stats = self.url_stats[url]
-            success = stats['success_count']
-            failure = stats['failure_count']
-            total = success + failure
-            
-            if total == 0:
-                return 0.5  # Neutral score for untested URLs
-            
-            success_rate = success / total
-            avg_time = stats['avg_response_time']
-            
-            # Penalize for consecutive failures
-            consecutive_penalty = min(stats['consecutive_failures'] * 0.1, 0.5)
-            
-            # Score: 70% success rate, 20% response time, 10% consecutive failures
-            score = (success_rate * 0.7) - (min(avg_time / 10.0, 0.2)) - consecutive_penalty
-            return max(0, score)
+        # A URL due for a half-open probe goes first so recovered capacity returns promptly
+        probes = [url for url in active_urls if self.url_stats[url]['circuit_state'] != 'closed']
+        if probes:
+            return self._claim(probes[0])
         
         # Sort by score and return best
-        scored_urls = [(url, calculate_score(url)) for url in active_urls]
+        scored_urls = [(url, self._calculate_score(url)) for url in active_urls]
         scored_urls.sort(key=lambda x: x[1], reverse=True)
         
-        return scored_urls[0][0]
+        return self._claim(scored_urls[0][0])
     
     def mark_success(self, url: str, response_time: float):
         """Mark URL as successful"""
@@ -121,12 +291,36 @@ class APIURLManager:
             stats['success_count'] += 1
             stats['consecutive_failures'] = 0
             stats['last_success'] = datetime.now()
+            if stats['circuit_state'] != 'closed':
+                logger.info(f"API URL {url} circuit closed, back in rotation")
+            stats['circuit_state'] = 'closed'
+            stats['open_count'] = 0
             stats['is_active'] = True
             
             # Update average response time
             total = stats['success_count']
             stats['total_response_time'] += response_time
             stats['avg_response_time'] = stats['total_response_time'] / total
+            stats['recent_response_times'].append(response_time)
+            self._record_latency(url, response_time)
+    
+    def get_latency_percentile(self, url: str, percentile: float, min_samples: int = 10) -> Optional[float]:
+        """Get a percentile of recent response times, or None without enough samples"""
+        samples = self.url_stats.get(url, {}).get('recent_response_times')
+        if not samples or len(samples) < min_samples:
+            return None
+        
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(percentile * len(ordered)))]
+    
+    def get_hedge_url(self, exclude_url: str) -> Optional[str]:
+        """Get the healthiest active URL other than the one already in use"""
+        candidates = [url for url in self._get_available_urls() if url != exclude_url]
+        if not candidates:
+            return None
+        if self.strategy == 'p2c':
+            return self._claim(min(candidates, key=self._load_cost))
+        return self._claim(max(candidates, key=self._calculate_score))
     
     def mark_failure(self, url: str):
         """Mark URL as failed"""
@@ -135,15 +329,27 @@ class APIURLManager:
             stats['failure_count'] += 1
             stats['consecutive_failures'] += 1
             stats['last_failure'] = datetime.now()
+            self._record_latency(url, Config.API_TIMEOUT)
             
-            # Deactivate after 3 consecutive failures
-            if stats['consecutive_failures'] >= 3:
-                stats['is_active'] = False
-                logger.warning(f"API URL {url} deactivated after 3 consecutive failures")
+            # A failed probe reopens the circuit; a closed one trips after too many failures in a row.
+            # Failures of requests sent before the circuit opened change nothing.
+            if stats['circuit_state'] == 'half_open':
+                self._open_circuit(url)
+            elif stats['circuit_state'] == 'closed' and stats['consecutive_failures'] >= Config.API_CIRCUIT_FAILURE_THRESHOLD:
+                self._open_circuit(url)
+    
+    def mark_inconclusive(self, url: str):
+        """Note a request that failed for reasons outside the URL (its proxy), judging it neither way"""
+        if url in self.url_stats:
+            stats = self.url_stats[url]
+            # A half-open probe that never reached the URL may be retried straight away
+            if stats['circuit_state'] == 'half_open':
+                stats['next_probe_at'] = time.monotonic()
     
     def get_stats(self) -> List[Dict[str, Any]]:
         """Get statistics for all URLs"""
         result = []
+        now = time.monotonic()
         for url in self.urls:
             stats = self.url_stats[url]
             success = stats['success_count']
@@ -157,8 +363,12 @@ class APIURLManager:
                 'failure_count': failure,
                 'success_rate': success_rate,
                 'avg_response_time': stats['avg_response_time'],
+                'ewma_latency': stats['ewma_latency'],
+                'in_flight': stats['in_flight'],
                 'consecutive_failures': stats['consecutive_failures'],
                 'is_active': stats['is_active'],
+                'circuit_state': stats['circuit_state'],
+                'probe_in': max(0.0, stats['next_probe_at'] - now) if stats['circuit_state'] != 'closed' else 0.0,
                 'last_success': stats['last_success'],
                 'last_failure': stats['last_failure']
             })
@@ -166,48 +376,453 @@ class APIURLManager:
         return sorted(result, key=lambda x: x['success_rate'], reverse=True)
 
 class RateLimiter:
-    """Rate limiter to prevent API abuse"""
+    """Token-bucket rate limiter (GCRA) on the monotonic clock.
+
+    Each acquire reserves the next free slot in O(1) and sleeps exactly until it,
+    so concurrent waiters are released in FIFO order at the configured rate.
+    """
     
     def __init__(self, requests_per_minute: int = 30, burst: int = 10):
         self.requests_per_minute = requests_per_minute
-        self.burst = burst
-        self.requests = []
-        self.burst_tokens = burst
-        self.last_refill = time.time()
+        self.burst = max(1, burst)
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        # Theoretical arrival time: when the bucket would be back to full
+        self.tat = time.monotonic()
+        self.blocked_until = 0.0
+    
+    def reserve(self) -> float:
+        """Reserve the next request slot and return how long to wait for it"""
+        if self.interval <= 0:
+            return 0.0
+        
+        now = time.monotonic()
+        # Slots resume one at a time after a block rather than as a full burst
+        tat = max(self.tat, now, self.blocked_until + (self.burst - 1) * self.interval)
+        allowed_at = tat - (self.burst - 1) * self.interval
+        self.tat = tat + self.interval
+        return max(0.0, allowed_at - now)
+    
+    def release(self, reserved_tat: float):
+        """Hand back a reserved slot if nobody has reserved after it"""
+        if self.tat == reserved_tat:
+            self.tat -= self.interval
+    
+    def available(self) -> float:
+        """Get the number of requests that could be made right now"""
+        if self.interval <= 0:
+            return float('inf')
+        if time.monotonic() < self.blocked_until:
+            return 0.0
+        return max(0.0, self.burst - max(0.0, self.tat - time.monotonic()) / self.interval)
+    
+    def set_rate(self, requests_per_minute: float):
+        """Change the rate; slots already handed out keep their time"""
+        self.requests_per_minute = requests_per_minute
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+    
+    def block_until(self, until: float):
+        """Hand out no new slot before the given monotonic time"""
+        self.blocked_until = max(self.blocked_until, until)
     
     async def acquire(self):
         """Acquire permission to make a request"""
-        now = time.time()
+        delay = self.reserve()
+        if delay <= 0:
+            return
         
-        if now - self.last_refill >= 60:
-            self.burst_tokens = self.burst
-            self.last_refill = now
-            self.requests = []
+        reserved_tat = self.tat
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.release(reserved_tat)
+            raise
+
+class AdaptiveRateLimiter(RateLimiter):
+    """RateLimiter that adapts its rate with AIMD.
+
+    A throttled response (429/5xx) multiplies the rate down once per round of requests in
+    flight, and every RATE_LIMIT_INCREASE_AFTER successes in a row add RATE_LIMIT_INCREASE_STEP
+    back, up to RATE_LIMIT_MAX_FACTOR times the configured rate. A limiter with no cap (0 rpm)
+    stays uncapped.
+    """
+    
+    def __init__(self, requests_per_minute: int = 30, burst: int = 10):
+        super().__init__(requests_per_minute, burst)
+        self.base_rpm = requests_per_minute
+        self.min_rpm = min(requests_per_minute, Config.RATE_LIMIT_MIN_RPM)
+        self.max_rpm = requests_per_minute * Config.RATE_LIMIT_MAX_FACTOR
+        self.success_streak = 0
+        self.throttle_count = 0
+        self.last_decrease = 0.0
+    
+    def on_success(self):
+        """Probe upward after a sustained run of successful responses"""
+        if self.interval <= 0 or not Config.RATE_LIMIT_ADAPTIVE:
+            return
         
-        if self.burst_tokens <= 0:
-            await asyncio.sleep(1)
-            return await self.acquire()
+        self.success_streak += 1
+        if self.success_streak >= Config.RATE_LIMIT_INCREASE_AFTER:
+            self.success_streak = 0
+            if self.requests_per_minute < self.max_rpm:
+                self.set_rate(min(self.max_rpm, self.requests_per_minute + Config.RATE_LIMIT_INCREASE_STEP))
+    
+    def on_throttle(self, sent_at: float, retry_after: Optional[float] = None):
+        """Back off after a throttled response to a request sent at the given monotonic time"""
+        if self.interval <= 0:
+            return
         
-        minute_ago = now - 60
-        self.requests = [req_time for req_time in self.requests if req_time > minute_ago]
+        self.success_streak = 0
+        self.throttle_count += 1
+        now = time.monotonic()
+        if retry_after:
+            self.block_until(now + min(retry_after, Config.ERROR_COOLDOWN))
         
-        if len(self.requests) >= self.requests_per_minute:
-            sleep_time = 60 - (now - self.requests[0])
-            if sleep_time > 0:
-                await asyncio.sleep(sleep_time)
-                return await self.acquire()
+        # Requests sent before the last decrease were paced at the old rate; don't cut again for them
+        if not Config.RATE_LIMIT_ADAPTIVE or sent_at < self.last_decrease:
+            return
         
-        self.requests.append(now)
-        self.burst_tokens -= 1
+        self.last_decrease = now
+        new_rpm = max(self.min_rpm, self.requests_per_minute * Config.RATE_LIMIT_DECREASE_FACTOR)
+        if new_rpm < self.requests_per_minute:
+            logger.warning(f"Throttled: lowering rate from {self.requests_per_minute:.1f} to {new_rpm:.1f} rpm")
+            self.set_rate(new_rpm)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the effective rate next to the configured one"""
+        return {
+            'effective_rpm': self.requests_per_minute,
+            'configured_rpm': self.base_rpm,
+            'throttle_count': self.throttle_count,
+            'blocked_for': max(0.0, self.blocked_until - time.monotonic())
+        }
+
+class RateLimitBudgets:
+    """Hierarchical rate limits: global, per API URL and per proxy (or direct)"""
+    
+    def __init__(self):
+        self.global_limiter = RateLimiter(Config.RATE_LIMIT_GLOBAL_RPM, Config.RATE_LIMIT_GLOBAL_BURST)
+        self.url_limiters: Dict[str, RateLimiter] = {}
+        self.proxy_limiters: Dict[str, RateLimiter] = {}
+    
+    def get_url_limiter(self, url: str) -> RateLimiter:
+        """Get the budget for an API URL"""
+        if url not in self.url_limiters:
+            self.url_limiters[url] = AdaptiveRateLimiter(Config.RATE_LIMIT_REQUESTS_PER_MINUTE, Config.RATE_LIMIT_BURST)
+        return self.url_limiters[url]
+    
+    def get_proxy_limiter(self, proxy: Optional[str]) -> RateLimiter:
+        """Get the budget for a proxy, or for direct requests when proxy is None"""
+        key = proxy or 'direct'
+        if key not in self.proxy_limiters:
+            if proxy:
+                self.proxy_limiters[key] = AdaptiveRateLimiter(Config.RATE_LIMIT_PER_PROXY_RPM, Config.RATE_LIMIT_PER_PROXY_BURST)
+            else:
+                self.proxy_limiters[key] = AdaptiveRateLimiter(Config.RATE_LIMIT_DIRECT_RPM, Config.RATE_LIMIT_DIRECT_BURST)
+        return self.proxy_limiters[key]
+    
+    async def acquire(self, url: str, proxy: Optional[str] = None):
+        """Reserve a slot in every budget this request consumes and wait for the latest one"""
+        limiters = [self.global_limiter, self.get_url_limiter(url), self.get_proxy_limiter(proxy)]
+        
+        delay = max(limiter.reserve() for limiter in limiters)
+        if delay <= 0:
+            return
+        
+        reserved = [(limiter, limiter.tat) for limiter in limiters]
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            for limiter, reserved_tat in reserved:
+                limiter.release(reserved_tat)
+            raise
+    
+    def record_response(self, url: str, proxy: Optional[str], status_code: int,
+                        sent_at: float, retry_after: Optional[float] = None):
+        """Feed a response status back into the adaptive URL and proxy budgets"""
+        url_limiter = self.get_url_limiter(url)
+        proxy_limiter = self.get_proxy_limiter(proxy)
+        
+        if status_code == 429:
+            # Either the endpoint or the proxy's IP is being throttled; Retry-After is the endpoint's
+            url_limiter.on_throttle(sent_at, retry_after)
+            proxy_limiter.on_throttle(sent_at)
+        elif status_code >= 500:
+            url_limiter.on_throttle(sent_at, retry_after)
+        elif status_code < 400 or status_code == 404:
+            url_limiter.on_success()
+            proxy_limiter.on_success()
+    
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get the effective rates of the URL and proxy budgets"""
+        return {
+            'urls': {url: limiter.get_stats() for url, limiter in self.url_limiters.items()},
+            'proxies': {proxy: limiter.get_stats() for proxy, limiter in self.proxy_limiters.items()}
+        }
+
+class GraphQuotaManager:
+    """Graph API quota for the access token: a local per-minute budget plus Meta's usage headers.
+
+    Graph calls only go out while both have room. Otherwise lookups are routed to the scraper
+    URLs instead of waiting, so the token is never pushed into a throttle lockout.
+    """
+    
+    # Application, user, page, custom and Instagram business use case rate limit errors
+    THROTTLE_ERROR_CODES = {4, 17, 32, 613, 80002}
+    
+    def __init__(self):
+        self.limiter = RateLimiter(Config.IG_GRAPH_API_RPM, Config.IG_GRAPH_API_RPM)
+        self.app_usage = 0.0  # percent, highest of call count / CPU time / total time
+        self.business_usage = 0.0
+        self.blocked_until = 0.0
+        self.stats = {'graph_calls': 0, 'routed_to_scrapers': 0, 'throttled': 0}
+    
+    def get_usage(self) -> float:
+        """Get the highest usage percentage Meta last reported"""
+        return max(self.app_usage, self.business_usage)
+    
+    def available(self) -> float:
+        """Get the Graph calls that may go out right now"""
+        if time.monotonic() < self.blocked_until:
+            return 0.0
+        return self.limiter.available()
+    
+    def allows(self, reserve: float = 0.0) -> bool:
+        """Check whether a lookup may use the Graph API, keeping ``reserve`` calls spare"""
+        return self.available() >= 1 + reserve
+    
+    def try_acquire(self, calls: int = 1) -> bool:
+        """Take Graph calls from the budget without waiting; a batch takes one per sub-request"""
+        if self.available() < calls:
+            self.stats['routed_to_scrapers'] += calls
+            return False
+        for _ in range(calls):
+            self.limiter.reserve()
+        self.stats['graph_calls'] += calls
+        return True
+    
+    def _block(self, seconds: float, reason: str):
+        """Stop Graph calls for a while"""
+        until = time.monotonic() + seconds
+        if until > self.blocked_until:
+            self.blocked_until = until
+            logger.warning(f"Graph API paused for {seconds:.0f}s ({reason}), routing lookups to scraper URLs")
+    
+    def _parse_usage(self, usage: Any) -> float:
+        """Get the highest percentage from a usage header entry"""
+        if not isinstance(usage, dict):
+            return 0.0
+        return max(float(usage.get(key) or 0) for key in ('call_count', 'total_cputime', 'total_time'))
+    
+    def is_throttle_error(self, resp: APIResponse) -> bool:
+        """Check whether a Graph response is a rate limit error"""
+        error = resp.data.get('error') if isinstance(resp.data, dict) else None
+        return isinstance(error, dict) and error.get('code') in self.THROTTLE_ERROR_CODES
+    
+    def record_response(self, resp: APIResponse):
+        """Update usage from a Graph response's headers and back off before or on throttling"""
+        headers = {key.lower(): value for key, value in resp.headers.items()}
+        try:
+            if 'x-app-usage' in headers:
+                self.app_usage = self._parse_usage(json.loads(headers['x-app-usage']))
+            if 'x-business-use-case-usage' in headers:
+                regain_minutes = 0.0
+                business_usage = 0.0
+                for entries in json.loads(headers['x-business-use-case-usage']).values():
+                    for entry in entries:
+                        business_usage = max(business_usage, self._parse_usage(entry))
+                        regain_minutes = max(regain_minutes, float(entry.get('estimated_time_to_regain_access') or 0))
+                self.business_usage = business_usage
+                if regain_minutes > 0:
+                    self._block(regain_minutes * 60, "business use case limit reached")
+        except (ValueError, TypeError, AttributeError) as e:
+            logger.error(f"Could not parse Graph usage headers: {e}")
+        
+        if self.is_throttle_error(resp):
+            self.stats['throttled'] += 1
+            self._block(Config.IG_GRAPH_THROTTLE_BACKOFF, f"rate limit error {resp.data['error'].get('code')}")
+        elif self.get_usage() >= Config.IG_GRAPH_USAGE_LIMIT:
+            self._block(Config.IG_GRAPH_USAGE_COOLDOWN, f"usage at {self.get_usage():.0f}%")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get quota counters and the current usage"""
+        return {
+            **self.stats,
+            'usage': self.get_usage(),
+            'available': self.available(),
+            'blocked_for': max(0.0, self.blocked_until - time.monotonic())
+        }
+
+class GraphBatcher:
+    """Collects Graph business_discovery lookups for a short window and sends them as batch calls.
+
+    Concurrent monitor checks land in the same window, so up to IG_GRAPH_BATCH_SIZE lookups
+    share one HTTP request. Meta counts every sub-request, so each still takes a quota slot.
+    """
+    
+    def __init__(self, client: 'APIClient'):
+        self.client = client
+        self.pending: List[Tuple[str, bool, asyncio.Future]] = []
+        self.flush_task: Optional[asyncio.Task] = None
+        self.send_tasks = set()
+        self.stats = {'batches': 0, 'batched_lookups': 0}
+    
+    async def lookup(self, username: str, probe: bool = False) -> APIResponse:
+        """Queue a lookup for the next batch and wait for its answer"""
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((username, probe, future))
+        
+        while len(self.pending) >= Config.IG_GRAPH_BATCH_SIZE:
+            self._send(self._take_batch())
+        if self.pending and self.flush_task is None:
+            self.flush_task = asyncio.create_task(self._flush_after(Config.IG_GRAPH_BATCH_WINDOW))
+        
+        # A caller giving up cancels only its own future; the batch still goes out for the others
+        return await future
+    
+    def _take_batch(self) -> List[Tuple[str, bool, asyncio.Future]]:
+        """Remove up to one batch of lookups from the pending list"""
+        batch = self.pending[:Config.IG_GRAPH_BATCH_SIZE]
+        self.pending = self.pending[Config.IG_GRAPH_BATCH_SIZE:]
+        return batch
+    
+    async def _flush_after(self, delay: float):
+        """Send whatever is pending once the collection window closes"""
+        await asyncio.sleep(delay)
+        self.flush_task = None
+        while self.pending:
+            self._send(self._take_batch())
+    
+    def _send(self, batch: List[Tuple[str, bool, asyncio.Future]]):
+        """Send a batch in the background"""
+        task = asyncio.create_task(self._send_batch(batch))
+        self.send_tasks.add(task)
+        task.add_done_callback(self.send_tasks.discard)
+    
+    async def _send_batch(self, batch: List[Tuple[str, bool, asyncio.Future]]):
+        """Request a batch and hand each lookup its own answer"""
+        batch = [item for item in batch if not item[2].done()]
+        if not batch:
+            return
+        
+        try:
+            if len(batch) == 1:
+                username, probe, _ = batch[0]
+                responses = [await self.client._get_instagram_profile_graph(username, None, probe)]
+            else:
+                self.stats['batches'] += 1
+                self.stats['batched_lookups'] += len(batch)
+                responses = await self.client._request_graph_batch([(username, probe) for username, probe, _ in batch])
+        except Exception as e:
+            logger.error(f"Graph batch of {len(batch)} lookups failed: {e}")
+            responses = [APIResponse(False, {}, 0, error=f"Graph batch error: {str(e)}")] * len(batch)
+        
+        for (_, _, future), response in zip(batch, responses):
+            if not future.done():
+                future.set_result(response)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get batching counters"""
+        return {**self.stats, 'pending': len(self.pending)}
+
+class ProxySessionPool:
+    """Keep-alive connection pools, one per proxy, so proxied requests reuse their tunnels.
+
+    Pools are closed least recently used first beyond PROXY_POOL_MAX_SESSIONS and after
+    PROXY_POOL_IDLE_TIMEOUT unused. Each pool's connection limit follows the proxy's peak
+    concurrency: a pool that runs full is retired (closed once drained) for one twice its size,
+    and a proxy's peak halves whenever its pool is closed for being idle.
+    """
+    
+    def __init__(self, session_factory: Callable[[aiohttp.TCPConnector], aiohttp.ClientSession]):
+        self.session_factory = session_factory
+        self.pools: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self.retired: List[Dict[str, Any]] = []
+        self.peaks: Dict[str, int] = {}
+        self.stats = {'created': 0, 'reused': 0, 'evicted': 0, 'resized': 0}
+    
+    def _connection_limit(self, proxy: str) -> int:
+        """Size a new pool from the proxy's peak concurrency"""
+        return max(Config.PROXY_POOL_MIN_CONNECTIONS,
+                   min(Config.PROXY_POOL_MAX_CONNECTIONS, 2 * self.peaks.get(proxy, 0)))
+    
+    async def _retire(self, pool: Dict[str, Any]):
+        """Close a pool now, or once its in-flight requests finish"""
+        if pool['in_flight'] > 0:
+            self.retired.append(pool)
+        else:
+            await pool['session'].close()
+    
+    async def _evict_idle(self):
+        """Close pools unused for PROXY_POOL_IDLE_TIMEOUT (the least recently used come first)"""
+        now = time.monotonic()
+        while self.pools:
+            proxy, pool = next(iter(self.pools.items()))
+            if pool['in_flight'] > 0 or now - pool['last_used'] < Config.PROXY_POOL_IDLE_TIMEOUT:
+                break
+            del self.pools[proxy]
+            self.peaks[proxy] = self.peaks.get(proxy, 0) // 2
+            self.stats['evicted'] += 1
+            await pool['session'].close()
+    
+    async def acquire(self, proxy: str) -> Dict[str, Any]:
+        """Take the proxy's pool for one request; hand it back with release()"""
+        await self._evict_idle()
+        pool = self.pools.get(proxy)
+        if pool and pool['in_flight'] >= pool['limit'] and pool['limit'] < Config.PROXY_POOL_MAX_CONNECTIONS:
+            del self.pools[proxy]
+            self.stats['resized'] += 1
+            await self._retire(pool)
+            pool = None
+        
+        if pool is None:
+            limit = self._connection_limit(proxy)
+            connector = aiohttp.TCPConnector(
+                limit=limit,
+                ttl_dns_cache=300,
+                use_dns_cache=True,
+                keepalive_timeout=Config.PROXY_POOL_IDLE_TIMEOUT,
+            )
+            pool = {'session': self.session_factory(connector), 'limit': limit, 'in_flight': 0}
+            self.pools[proxy] = pool
+            self.stats['created'] += 1
+            while len(self.pools) > Config.PROXY_POOL_MAX_SESSIONS:
+                _, oldest = self.pools.popitem(last=False)
+                self.stats['evicted'] += 1
+                await self._retire(oldest)
+        else:
+            self.pools.move_to_end(proxy)
+            self.stats['reused'] += 1
+        
+        pool['in_flight'] += 1
+        pool['last_used'] = time.monotonic()
+        self.peaks[proxy] = max(self.peaks.get(proxy, 0), pool['in_flight'])
+        return pool
+    
+    async def release(self, pool: Dict[str, Any]):
+        """Hand back a pool taken with acquire()"""
+        pool['in_flight'] -= 1
+        pool['last_used'] = time.monotonic()
+        if pool['in_flight'] == 0 and pool in self.retired:
+            self.retired.remove(pool)
+            await pool['session'].close()
+    
+    async def close(self):
+        """Close every pool"""
+        for pool in list(self.pools.values()) + self.retired:
+            await pool['session'].close()
+        self.pools.clear()
+        self.retired.clear()
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Get pool counters"""
+        return {**self.stats, 'pools': len(self.pools),
+                'connections': sum(pool['limit'] for pool in self.pools.values())}
 
 class APIClient:
     """Enhanced API client with retry logic and multiple URL support"""
     
     def __init__(self):
-        self.rate_limiter = RateLimiter(
-            Config.RATE_LIMIT_REQUESTS_PER_MINUTE,
-            Config.RATE_LIMIT_BURST
-        )
+        self.rate_limits = RateLimitBudgets()
         self.url_manager = APIURLManager(
             Config.INSTAGRAM_API_URLS,
             Config.API_URL_ROTATION_STRATEGY
@@ -216,6 +831,19 @@ class APIClient:
         self.consecutive_errors = 0
         self.last_error_time = None
         self.user_agent_index = 0
+        self.inflight_requests: Dict[str, asyncio.Task] = {}
+        self.coalesced_requests = 0
+        self.hedge_tokens = float(Config.API_HEDGE_BURST)
+        self.hedged_requests = 0
+        self.hedge_wins = 0
+        self.race_wins = {'graph': 0, 'scraper': 0}
+        self.profile_cache = ProfileCache(Config.PROFILE_CACHE_SIZE)
+        self.graph_batcher = GraphBatcher(self)
+        self.graph_quota = GraphQuotaManager()
+        self.refresh_tasks = set()
+        self.proxy_sessions = ProxySessionPool(self._new_session)
+        # Sticky proxy -> API URL pairs, so a proxy keeps reusing one warm tunnel
+        self.proxy_affinity: Dict[str, str] = {}
     
     async def __aenter__(self):
         """Async context manager entry"""
@@ -228,16 +856,18 @@ class APIClient:
     
     async def _create_session(self):
         """Create aiohttp session with proper configuration"""
-        timeout = aiohttp.ClientTimeout(total=Config.API_TIMEOUT)
         connector = aiohttp.TCPConnector(
             limit=100,
             limit_per_host=30,
             ttl_dns_cache=300,
             use_dns_cache=True,
         )
-        
-        self.session = aiohttp.ClientSession(
-            timeout=timeout,
+        self.session = self._new_session(connector)
+    
+    def _new_session(self, connector: aiohttp.TCPConnector) -> aiohttp.ClientSession:
+        """Create an aiohttp session with the client's timeout and headers over a connector"""
+        return aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=Config.API_TIMEOUT),
             connector=connector,
             headers={
                 'User-Agent': self._get_user_agent(),
@@ -251,6 +881,7 @@ class APIClient:
         if self.session:
             await self.session.close()
             self.session = None
+        await self.proxy_sessions.close()
     
     def _get_user_agent(self) -> str:
         """Get rotating user agent"""
@@ -269,9 +900,15 @@ class APIClient:
         return (datetime.now() - self.last_error_time).total_seconds() < Config.ERROR_COOLDOWN
     
     async def _make_request(self, url: str, params: Dict[str, Any], 
-                          proxy: Optional[str] = None) -> APIResponse:
-        """Make HTTP request with proper error handling"""
-        if not self.session:
+                          proxy: Optional[str] = None,
+                          method: str = 'GET', data: Optional[Dict[str, Any]] = None,
+                          rate_limited: bool = True, sent: Optional[asyncio.Event] = None) -> APIResponse:
+        """Make HTTP request with proper error handling.
+
+        Graph API calls pass rate_limited=False: GraphQuotaManager is their only budget.
+        ``sent`` is set once the request has its rate limit slot and goes out.
+        """
+        if not self.session or self.session.closed:
             await self._create_session()
         
         if self._is_in_cooldown():
@@ -283,15 +920,24 @@ class APIClient:
                 api_url=url
             )
         
-        await self.rate_limiter.acquire()
-        await asyncio.sleep(random.uniform(0.05, 0.2))
+        if rate_limited:
+            await self.rate_limits.acquire(url, proxy)
+            await asyncio.sleep(random.uniform(0.05, 0.2))
 
         start_time = time.time()
+        sent_at = time.monotonic()
+        # Proxied requests go through the proxy's own keep-alive pool
+        pool = await self.proxy_sessions.acquire(proxy) if proxy else None
+        session = pool['session'] if pool else self.session
+        if sent:
+            sent.set()
         
         try:
-            async with self.session.get(
+            async with session.request(
+                method,
                 url,
                 params=params,
+                data=data,
                 proxy=proxy,
                 headers={
                     'User-Agent': self._get_user_agent(),
@@ -300,6 +946,10 @@ class APIClient:
                 }
             ) as response:
                 response_time = time.time() - start_time
+                if rate_limited:
+                    self.rate_limits.record_response(
+                        url, proxy, response.status, sent_at, self._get_retry_after(response)
+                    )
                 
                 if response.status == 200:
                     try:
@@ -311,7 +961,8 @@ class APIClient:
                             status_code=response.status,
                             proxy_used=proxy,
                             response_time=response_time,
-                            api_url=url
+                            api_url=url,
+                            headers=dict(response.headers)
                         )
                     except json.JSONDecodeError as e:
                         logger.error(f"JSON decode error from {url}: {e}")
@@ -336,6 +987,14 @@ class APIClient:
                     error_data = {}
                     if response.status == 403 and proxy:
                         error_data = {'st': 'proxy_error'}
+                    
+                    # Keep a structured error body (e.g. Graph's error code) for the caller
+                    try:
+                        body = await response.json(content_type=None)
+                        if isinstance(body, dict) and isinstance(body.get('error'), dict):
+                            error_data['error'] = body['error']
+                    except (ValueError, aiohttp.ClientError):
+                        pass
 
                     return APIResponse(
                         success=False,
@@ -344,12 +1003,15 @@ class APIClient:
                         error=error_msg,
                         proxy_used=proxy,
                         response_time=response_time,
-                        api_url=url
+                        api_url=url,
+                        headers=dict(response.headers)
                     )
         
         except asyncio.TimeoutError:
-            self.consecutive_errors += 1
-            self.last_error_time = datetime.now()
+            # A proxied failure is blamed on the proxy, not counted toward the API cooldown
+            if not proxy:
+                self.consecutive_errors += 1
+                self.last_error_time = datetime.now()
             timeout_data = {'st': 'proxy_error'} if proxy else {}
             return APIResponse(
                 success=False,
@@ -362,8 +1024,9 @@ class APIClient:
             )
         
         except aiohttp.ClientError as e:
-            self.consecutive_errors += 1
-            self.last_error_time = datetime.now()
+            if not proxy:
+                self.consecutive_errors += 1
+                self.last_error_time = datetime.now()
             client_error_data = {'st': 'proxy_error'} if proxy else {}
             return APIResponse(
                 success=False,
@@ -388,35 +1051,155 @@ class APIClient:
                 response_time=time.time() - start_time,
                 api_url=url
             )
+        
+        finally:
+            if pool:
+                await self.proxy_sessions.release(pool)
     
-    async def get_instagram_profile(self, username: str, proxy: Optional[str] = None) -> APIResponse:
-        """Get Instagram profile information with URL rotation"""
+    def _get_retry_after(self, response: aiohttp.ClientResponse) -> Optional[float]:
+        """Read the Retry-After header (seconds or HTTP date) from a response"""
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
+    
+    async def get_instagram_profile(self, username: str, proxy: Optional[str] = None,
+                                    probe: bool = False, retry: bool = True) -> APIResponse:
+        """Get Instagram profile information, sharing one in-flight request per username.
+
+        With ``probe`` only existence is checked: an 'ok' answer has just 'usr' and 'st'
+        (plus 'id' when the source returns it), which is all ban/unban checks need.
+        With ``retry=False`` a transient failure returns at once with a ``retry_after``
+        hint instead of sleeping between attempts, for callers that reschedule themselves.
+        """
         username = username.replace('@', '').strip().lower()
         
-        # Try Graph API first if enabled
+        # A full fetch in flight answers a probe as well
+        key = username
+        task = self.inflight_requests.get(username)
+        if task is None and probe:
+            key = f"probe:{username}"
+            task = self.inflight_requests.get(key)
+        
+        shared = task is not None
+        if shared:
+            self.coalesced_requests += 1
+        else:
+            task = asyncio.create_task(self._fetch_and_cache_profile(username, proxy, probe, retry))
+            self.inflight_requests[key] = task
+            task.add_done_callback(lambda t: self._clear_inflight(key, t))
+        
+        # Shield so one caller giving up does not cancel the fetch for the others
+        response = await asyncio.shield(task)
+        
+        # A proxy failure from someone else's proxy says nothing about ours
+        if shared and response.data.get('st') == 'proxy_error' and response.proxy_used != proxy:
+            response = await self._fetch_instagram_profile(username, proxy, probe, retry)
+            self.profile_cache.put(username, response)
+        # A single attempt made for a caller that reschedules itself is not enough for one that waits
+        elif shared and retry and response.retry_after is not None:
+            response = await self._fetch_instagram_profile(username, proxy, probe)
+            self.profile_cache.put(username, response)
+        
+        return response
+    
+    async def get_cached_profile(self, username: str, proxy: Optional[str] = None) -> APIResponse:
+        """Get a profile for an interactive lookup, answering from the cache when possible.
+
+        A fresh entry is returned as is. With PROFILE_CACHE_SWR a stale entry is returned
+        immediately and refreshed in the background; otherwise it is refetched.
+        """
+        username = username.replace('@', '').strip().lower()
+        
+        cached = self.profile_cache.get(username, allow_stale=Config.PROFILE_CACHE_SWR)
+        if cached is None:
+            return await self.get_instagram_profile(username, proxy)
+        
+        if not self.profile_cache.is_fresh(cached) and username not in self.inflight_requests:
+            refresh = asyncio.create_task(self.get_instagram_profile(username, proxy))
+            self.refresh_tasks.add(refresh)
+            refresh.add_done_callback(self.refresh_tasks.discard)
+        return cached
+    
+    async def _fetch_and_cache_profile(self, username: str, proxy: Optional[str] = None,
+                                       probe: bool = False, retry: bool = True) -> APIResponse:
+        """Fetch a profile and remember the answer for interactive lookups"""
+        response = await self._fetch_instagram_profile(username, proxy, probe, retry)
+        self.profile_cache.put(username, response)
+        return response
+    
+    def _clear_inflight(self, key: str, task: asyncio.Task):
+        """Drop a finished request from the in-flight table"""
+        if self.inflight_requests.get(key) is task:
+            del self.inflight_requests[key]
+    
+    async def _fetch_instagram_profile(self, username: str, proxy: Optional[str] = None,
+                                       probe: bool = False, retry: bool = True) -> APIResponse:
+        """Fetch Instagram profile information from the Graph API and/or the scraper URLs"""
         if Config.IG_GRAPH_API_ENABLED and Config.IG_ACCESS_TOKEN:
-            graph_resp = await self._get_instagram_profile_graph(username, proxy)
-            if graph_resp and (graph_resp.success or graph_resp.status_code in (404, 400)):
-                return graph_resp
+            # Race both sources only while the Graph quota has room to spare
+            race_reserve = Config.IG_GRAPH_API_RPM * Config.IG_GRAPH_RACE_RESERVE
+            if Config.IG_GRAPH_API_POLICY == 'race' and self.graph_quota.allows(race_reserve):
+                return await self._race_profile_sources(username, proxy, probe, retry)
+            
+            # Otherwise try Graph API first while any quota is left
+            if self.graph_quota.allows():
+                graph_resp = await self._graph_lookup(username, proxy, probe, retry)
+                if self._is_graph_answer(graph_resp):
+                    return graph_resp
+            else:
+                self.graph_quota.stats['routed_to_scrapers'] += 1
 
-        # Try multiple URLs with rotation
-        for attempt in range(Config.API_RETRY_ATTEMPTS):
+        return await self._get_instagram_profile_scrapers(username, proxy, probe, retry)
+    
+    def _is_graph_answer(self, graph_resp: Optional[APIResponse]) -> bool:
+        """Check whether a Graph API response is authoritative (found or not found)"""
+        if not graph_resp or self.graph_quota.is_throttle_error(graph_resp):
+            return False
+        return graph_resp.success or graph_resp.status_code in (404, 400)
+    
+    async def _race_profile_sources(self, username: str, proxy: Optional[str], probe: bool = False,
+                                    retry: bool = True) -> APIResponse:
+        """Query the Graph API and the scraper URLs together and return the first authoritative answer"""
+        graph = asyncio.create_task(self._graph_lookup(username, proxy, probe, retry))
+        scraper = asyncio.create_task(self._get_instagram_profile_scrapers(username, proxy, probe, retry))
+        pending = {graph, scraper}
+        fallback = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                if graph in done and self._is_graph_answer(graph.result()):
+                    self.race_wins['graph'] += 1
+                    return graph.result()
+                if scraper in done:
+                    fallback = scraper.result()
+                    if fallback.success:
+                        self.race_wins['scraper'] += 1
+                        return fallback
+            return fallback
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    async def _get_instagram_profile_scrapers(self, username: str, proxy: Optional[str] = None,
+                                              probe: bool = False, retry: bool = True) -> APIResponse:
+        """Get Instagram profile information from the scraper URLs with rotation and retries"""
+        # Try multiple URLs with rotation; without retry the caller reschedules from the hint
+        attempts = Config.API_RETRY_ATTEMPTS if retry else 1
+        for attempt in range(attempts):
             try:
-                # Get next URL based on rotation strategy
-                api_url = self.url_manager.get_next_url()
-                
-                response = await self._make_request(
-                    api_url,
-                    {'username': username},
-                    proxy
-                )
+                response = await self._request_profile(username, proxy)
+                api_url = response.api_url
                 
-                # Update URL stats
                 if response.success:
-                    self.url_manager.mark_success(api_url, response.response_time)
-                    return self._process_instagram_response(response, username)
-                else:
-                    self.url_manager.mark_failure(api_url)
+                    return self._process_instagram_response(response, username, probe)
                 
                 if response.status_code == 404:
                     return APIResponse(
@@ -427,17 +1210,19 @@ class APIClient:
                         response_time=response.response_time,
                         api_url=api_url
                     )
-                elif attempt < Config.API_RETRY_ATTEMPTS - 1:
+                elif attempt < attempts - 1:
                     delay = Config.API_RETRY_DELAY * (2 ** attempt)
                     logger.warning(f"API request to {api_url} failed (attempt {attempt + 1}), trying next URL in {delay}s")
                     await asyncio.sleep(delay)
                     continue
                 else:
+                    if not retry:
+                        response.retry_after = self._get_retry_hint(api_url)
                     return response
             
             except Exception as e:
                 logger.error(f"Error in get_instagram_profile attempt {attempt + 1}: {e}")
-                if attempt < Config.API_RETRY_ATTEMPTS - 1:
+                if attempt < attempts - 1:
                     await asyncio.sleep(Config.API_RETRY_DELAY)
                 else:
                     return APIResponse(
@@ -445,7 +1230,8 @@ class APIClient:
                         data={},
                         status_code=0,
                         error=f"All retry attempts failed: {str(e)}",
-                        proxy_used=proxy
+                        proxy_used=proxy,
+                        retry_after=None if retry else Config.API_RETRY_DELAY
                     )
         
         return APIResponse(
@@ -456,20 +1242,197 @@ class APIClient:
             proxy_used=proxy
         )
     
-    async def _get_instagram_profile_graph(self, username: str, proxy: Optional[str]) -> Optional[APIResponse]:
+    def _get_retry_hint(self, api_url: Optional[str]) -> float:
+        """Get how long a caller should wait before retrying, honouring a URL's Retry-After block"""
+        if not api_url:
+            return Config.API_RETRY_DELAY
+        blocked_for = self.rate_limits.get_url_limiter(api_url).get_stats()['blocked_for']
+        return max(Config.API_RETRY_DELAY, blocked_for)
+    
+    async def _request_profile_from_url(self, api_url: str, username: str, proxy: Optional[str],
+                                        sent: Optional[asyncio.Event] = None) -> APIResponse:
+        """Request a profile from one API URL and record its health"""
+        self.url_manager.begin_request(api_url)
+        try:
+            response = await self._make_request(api_url, {'username': username}, proxy, sent=sent)
+        finally:
+            self.url_manager.end_request(api_url)
+        
+        # Update URL stats; a 404 is the URL answering correctly about a missing profile.
+        # A proxy failure goes to the proxy's health, not the URL's circuit
+        if response.success or response.status_code == 404:
+            self.url_manager.mark_success(api_url, response.response_time)
+            if proxy and Config.PROXY_ENDPOINT_AFFINITY:
+                self.proxy_affinity[proxy] = api_url
+        elif response.data.get('st') == 'proxy_error':
+            self.url_manager.mark_inconclusive(api_url)
+        else:
+            self.url_manager.mark_failure(api_url)
+            if proxy and self.proxy_affinity.get(proxy) == api_url:
+                del self.proxy_affinity[proxy]
+        return response
+    
+    def _take_hedge_token(self) -> bool:
+        """Spend a hedge token; every primary request earns API_HEDGE_MAX_RATIO of one"""
+        if self.hedge_tokens >= 1:
+            self.hedge_tokens -= 1
+            return True
+        return False
+    
+    async def _request_profile(self, username: str, proxy: Optional[str]) -> APIResponse:
+        """Request a profile from the next API URL, hedging to a second URL when it is slow"""
+        api_url = self.url_manager.get_next_url(self.proxy_affinity.get(proxy) if proxy else None)
+        if api_url is None:
+            return APIResponse(
+                success=False,
+                data={},
+                status_code=0,
+                error="All API URLs are circuit-open",
+                proxy_used=proxy
+            )
+        if not Config.API_HEDGING_ENABLED or len(self.url_manager.urls) < 2:
+            return await self._request_profile_from_url(api_url, username, proxy)
+        
+        self.hedge_tokens = min(Config.API_HEDGE_BURST, self.hedge_tokens + Config.API_HEDGE_MAX_RATIO)
+        sent = asyncio.Event()
+        primary = asyncio.create_task(self._request_profile_from_url(api_url, username, proxy, sent))
+        
+        hedge_delay = self.url_manager.get_latency_percentile(api_url, Config.API_HEDGE_PERCENTILE)
+        hedge_delay = max(Config.API_HEDGE_MIN_DELAY, hedge_delay or Config.API_HEDGE_DEFAULT_DELAY)
+        # The latency percentile is network time, so the hedge timer starts only once the
+        # primary has its rate limit slot; queueing behind the limiter is not slowness
+        sent_wait = asyncio.create_task(sent.wait())
+        try:
+            await asyncio.wait({primary, sent_wait}, return_when=asyncio.FIRST_COMPLETED)
+            done, _ = await asyncio.wait({primary}, timeout=0 if primary.done() else hedge_delay)
+        except asyncio.CancelledError:
+            primary.cancel()
+            raise
+        finally:
+            sent_wait.cancel()
+        if done:
+            return primary.result()
+        
+        hedge_url = self.url_manager.get_hedge_url(api_url)
+        if hedge_url is None or not self._take_hedge_token():
+            return await primary
+        
+        logger.debug(f"Hedging {username} to {hedge_url} after {hedge_delay:.2f}s on {api_url}")
+        self.hedged_requests += 1
+        hedge = asyncio.create_task(self._request_profile_from_url(hedge_url, username, proxy))
+        pending = {primary, hedge}
+        first_failure = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    response = task.result()
+                    # A 404 is an authoritative answer too, so it can win the race
+                    if response.success or response.status_code == 404:
+                        if task is hedge:
+                            self.hedge_wins += 1
+                        return response
+                    first_failure = first_failure or response
+            return first_failure
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    async def _graph_lookup(self, username: str, proxy: Optional[str], probe: bool = False,
+                            retry: bool = True) -> Optional[APIResponse]:
+        """Look a profile up on the Graph API, through the batcher for monitor checks.
+
+        Monitor checks (probes, or callers that reschedule themselves) can afford the batch
+        window; interactive lookups such as /insta go out at once.
+        """
+        if not Config.IG_BUSINESS_ACCOUNT_ID or not Config.IG_ACCESS_TOKEN:
+            return None
+        if Config.IG_GRAPH_BATCH_ENABLED and (probe or not retry):
+            return await self.graph_batcher.lookup(username, probe)
+        return await self._get_instagram_profile_graph(username, proxy, probe)
+    
+    def _get_graph_discovery_fields(self, username: str, probe: bool) -> str:
+        """Build the business_discovery fields parameter for a username"""
+        fields = ','.join(Config.IG_GRAPH_PROBE_FIELDS if probe else Config.IG_GRAPH_API_FIELDS)
+        return f"business_discovery.username({username}){{{fields}}}"
+    
+    async def _request_graph_batch(self, lookups: List[Tuple[str, bool]]) -> List[APIResponse]:
+        """Send up to IG_GRAPH_BATCH_SIZE business_discovery lookups as one Graph batch call.
+
+        Only as many lookups as the quota has room for are sent; the rest come back as
+        quota failures, so their callers go to the scraper URLs.
+        """
+        exhausted = APIResponse(False, {}, 0, error="Graph API quota exhausted")
+        # available() is inf with IG_GRAPH_API_RPM = 0 (no local cap), so cap before int()
+        sent = int(min(len(lookups), self.graph_quota.available()))
+        overflow = [exhausted] * (len(lookups) - sent)
+        self.graph_quota.stats['routed_to_scrapers'] += len(overflow)
+        if sent == 0:
+            return overflow
+        self.graph_quota.try_acquire(sent)
+        lookups = lookups[:sent]
+        
+        batch = [
+            {
+                'method': 'GET',
+                'relative_url': f"{Config.IG_BUSINESS_ACCOUNT_ID}?fields={quote(self._get_graph_discovery_fields(username, probe))}"
+            }
+            for username, probe in lookups
+        ]
+        resp = await self._make_request(
+            f"{Config.IG_GRAPH_API_BASE}/", {}, None,
+            method='POST', data={'access_token': Config.IG_ACCESS_TOKEN, 'batch': json.dumps(batch)},
+            rate_limited=False
+        )
+        self.graph_quota.record_response(resp)
+        if not resp.success or not isinstance(resp.data, list):
+            failed = APIResponse(False, {}, resp.status_code, error=resp.error or "Invalid Graph batch response",
+                                 response_time=resp.response_time, api_url=resp.api_url)
+            return [failed] * len(lookups) + overflow
+        
+        results = []
+        for i, (username, probe) in enumerate(lookups):
+            item = resp.data[i] if i < len(resp.data) else None
+            if not isinstance(item, dict):
+                # Graph returns null for sub-requests it did not finish in time
+                results.append(APIResponse(False, {}, 0, error="Graph batch item not completed", response_time=resp.response_time))
+                continue
+            try:
+                body = json.loads(item.get('body') or '{}')
+            except (TypeError, ValueError):
+                body = {}
+            code = item.get('code', 0)
+            sub_resp = APIResponse(code == 200, body, code, error=None if code == 200 else f"HTTP {code}",
+                                   response_time=resp.response_time)
+            results.append(self._parse_graph_response(sub_resp, username, probe))
+        return results + overflow
+    
+    async def _get_instagram_profile_graph(self, username: str, proxy: Optional[str],
+                                           probe: bool = False) -> Optional[APIResponse]:
         """Query Instagram Graph API using business_discovery"""
         try:
             if not Config.IG_BUSINESS_ACCOUNT_ID or not Config.IG_ACCESS_TOKEN:
                 return None
 
-            fields = ','.join(Config.IG_GRAPH_API_FIELDS)
             url = f"{Config.IG_GRAPH_API_BASE}/{Config.IG_BUSINESS_ACCOUNT_ID}"
             params = {
-                'fields': f"business_discovery.username({username}){{{fields}}}",
+                'fields': self._get_graph_discovery_fields(username, probe),
                 'access_token': Config.IG_ACCESS_TOKEN
             }
 
-            resp = await self._make_request(url, params, proxy)
+            if not self.graph_quota.try_acquire():
+                return APIResponse(False, {}, 0, error="Graph API quota exhausted", proxy_used=proxy)
+            
+            resp = await self._make_request(url, params, proxy, rate_limited=False)
+            self.graph_quota.record_response(resp)
+            return self._parse_graph_response(resp, username, probe)
+        except Exception as e:
+            logger.error(f"Graph API error for {username}: {e}")
+            return APIResponse(False, {}, 0, error=f"Graph API error: {str(e)}", proxy_used=proxy)
+
+    def _parse_graph_response(self, resp: APIResponse, username: str, probe: bool = False) -> APIResponse:
+        """Turn a business_discovery response into normalized profile data"""
+        try:
             if not resp.success:
                 data = resp.data or {}
                 error_info = data.get('error') if isinstance(data, dict) else None
@@ -484,6 +1447,10 @@ class APIClient:
             if not bd:
                 return APIResponse(True, {'usr': username, 'st': 'not_found'}, 404, proxy_used=resp.proxy_used, response_time=resp.response_time)
 
+            if probe:
+                probe_data = {'usr': bd.get('username', username), 'id': str(bd.get('id', 'N/A')), 'st': 'ok'}
+                return APIResponse(True, probe_data, 200, proxy_used=resp.proxy_used, response_time=resp.response_time, probe=True)
+
             normalized = {
                 'usr': bd.get('username', username),
                 'nm': bd.get('name') or 'N/A',
@@ -500,10 +1467,10 @@ class APIClient:
             return APIResponse(True, normalized, 200, proxy_used=resp.proxy_used, response_time=resp.response_time)
         except Exception as e:
             logger.error(f"Graph API error for {username}: {e}")
-            return APIResponse(False, {}, 0, error=f"Graph API error: {str(e)}", proxy_used=proxy)
+            return APIResponse(False, {}, 0, error=f"Graph API error: {str(e)}", proxy_used=resp.proxy_used)
 
-    def _process_instagram_response(self, response: APIResponse, username: str) -> APIResponse:
-        """Process Instagram API response and normalize data"""
+    def _process_instagram_response(self, response: APIResponse, username: str, probe: bool = False) -> APIResponse:
+        """Process Instagram API response and normalize data (only existence for a probe)"""
         try:
             data = response.data
             
@@ -528,6 +1495,17 @@ class APIClient:
                     api_url=response.api_url
                 )
             
+            if probe:
+                return APIResponse(
+                    success=True,
+                    data={'usr': profile.get('username', username), 'id': str(profile.get('id', 'N/A')), 'st': 'ok'},
+                    status_code=response.status_code,
+                    proxy_used=response.proxy_used,
+                    response_time=response.response_time,
+                    api_url=response.api_url,
+                    probe=True
+                )
+            
             normalized_data = {
                 'usr': profile.get('username', username),
                 'nm': profile.get('full_name', 'N/A') or 'N/A',
@@ -574,36 +1552,57 @@ class APIClient:
         return bio[:max_length] + '...'
     
     async def test_proxy(self, proxy_url: str) -> APIResponse:
-        """Test proxy connectivity"""
+        """Test proxy connectivity.
+
+        Goes straight to PROXY_TEST_URL with PROXY_TIMEOUT, outside the API rate limits, so
+        health checks of a large pool neither wait on the API budgets nor push the client
+        into its consecutive-error cooldown.
+        """
+        if not self.session or self.session.closed:
+            await self._create_session()
+        
+        start_time = time.time()
         try:
-            response = await self._make_request(
+            async with self.session.get(
                 Config.PROXY_TEST_URL,
-                {},
-                proxy_url
-            )
+                proxy=proxy_url,
+                timeout=aiohttp.ClientTimeout(total=Config.PROXY_TIMEOUT)
+            ) as response:
+                response_time = time.time() - start_time
+                data = await response.json(content_type=None) if response.status == 200 else {}
             
-            if response.success and 'origin' in response.data:
+            if isinstance(data, dict) and 'origin' in data:
                 return APIResponse(
                     success=True,
                     data={
                         'proxy': proxy_url,
-                        'external_ip': response.data.get('origin'),
-                        'response_time': response.response_time
+                        'external_ip': data.get('origin'),
+                        'response_time': response_time
                     },
-                    status_code=response.status_code,
+                    status_code=response.status,
                     proxy_used=proxy_url,
-                    response_time=response.response_time
+                    response_time=response_time
                 )
             else:
                 return APIResponse(
                     success=False,
                     data={},
-                    status_code=response.status_code,
-                    error=response.error or "Proxy test failed",
+                    status_code=response.status,
+                    error=f"HTTP {response.status}" if response.status != 200 else "Proxy test failed",
                     proxy_used=proxy_url,
-                    response_time=response.response_time
+                    response_time=response_time
                 )
         
+        except asyncio.TimeoutError:
+            return APIResponse(
+                success=False,
+                data={},
+                status_code=0,
+                error="Proxy test timeout",
+                proxy_used=proxy_url,
+                response_time=time.time() - start_time
+            )
+        
         except Exception as e:
             return APIResponse(
                 success=False,
@@ -615,4 +1614,11 @@ class APIClient:
     
     def get_url_stats(self) -> List[Dict[str, Any]]:
         """Get statistics for all API URLs"""
-        return self.url_manager.get_stats()
+        url_stats = self.url_manager.get_stats()
+        for url_stat in url_stats:
+            url_stat['rate_limit'] = self.rate_limits.get_url_limiter(url_stat['url']).get_stats()
+        return url_stats
+    
+    def get_rate_limit_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get the effective rates of the adaptive URL and proxy budgets"""
+        return self.rate_limits.get_stats()
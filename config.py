@@ -27,8 +27,27 @@ class Config:
     API_RETRY_DELAY = 2  # seconds
     API_RATE_LIMIT_DELAY = 1  # seconds between requests
     
-    # API URL rotation strategy: 'round_robin', 'random', or 'health_based'
-    API_URL_ROTATION_STRATEGY = 'health_based'
+    # Per-URL circuit breaker: open after consecutive failures, then probe (half-open) to recover
+    API_CIRCUIT_FAILURE_THRESHOLD = 3
+    API_CIRCUIT_OPEN_SECONDS = 30  # first open duration, doubled each time a probe fails
+    API_CIRCUIT_MAX_OPEN_SECONDS = 600
+    API_CIRCUIT_PROBE_INTERVAL = 10  # seconds between half-open probes
+    
+    # API URL rotation strategy: 'round_robin', 'random', 'health_based' or 'p2c'
+    # (power of two choices on decayed latency x in-flight requests, spreads load across mirrors)
+    API_URL_ROTATION_STRATEGY = os.getenv('API_URL_ROTATION_STRATEGY', 'p2c')
+    API_LATENCY_DECAY_SECONDS = 30  # EWMA time constant for URL latency
+    API_LATENCY_DEFAULT = 1.0  # assumed latency (seconds) of a URL with no samples yet
+    
+    # Hedged requests: if a URL has not answered within its observed latency percentile,
+    # send the same request to the next-best URL and take whichever answers first
+    API_HEDGING_ENABLED = os.getenv('API_HEDGING_ENABLED', 'true').lower() == 'true'
+    API_HEDGE_PERCENTILE = 0.95
+    API_HEDGE_DEFAULT_DELAY = 3.0  # seconds, used until a URL has enough latency samples
+    API_HEDGE_MIN_DELAY = 0.25  # seconds
+    API_HEDGE_MAX_RATIO = 0.1  # hedges may add at most ~10% extra requests
+    API_HEDGE_BURST = 5
+    API_LATENCY_SAMPLES = 50  # recent response times kept per URL
 
     # Official Instagram Graph API (optional)
     IG_GRAPH_API_ENABLED = os.getenv('IG_GRAPH_API_ENABLED', 'false').lower() == 'true'
@@ -38,7 +57,25 @@ class Config:
     IG_BUSINESS_ACCOUNT_ID = os.getenv('IG_BUSINESS_ACCOUNT_ID', '')
     IG_GRAPH_API_BASE = os.getenv('IG_GRAPH_API_BASE', 'https://graph.facebook.com/v18.0')
     IG_GRAPH_API_FIELDS = os.getenv('IG_GRAPH_API_FIELDS', 'id,username,name,followers_count,follows_count,media_count,account_type,profile_picture_url,is_verified').split(',')
-    IG_GRAPH_API_RPM = int(os.getenv('IG_GRAPH_API_RPM', '30'))
+    IG_GRAPH_API_RPM = int(os.getenv('IG_GRAPH_API_RPM', '30'))  # local budget for the access token
+    IG_GRAPH_USAGE_LIMIT = 80  # percent of Meta's reported usage at which lookups move to the scrapers
+    IG_GRAPH_USAGE_COOLDOWN = 300  # seconds before Graph is tried again after reaching the usage limit
+    IG_GRAPH_THROTTLE_BACKOFF = 900  # seconds to stay off Graph after a rate limit error
+    IG_GRAPH_PROBE_FIELDS = ['id']  # fields requested by monitor existence probes
+    # Batch concurrent monitor Graph lookups into one POST (IG_GRAPH_API_BASE may point at a local stub)
+    IG_GRAPH_BATCH_ENABLED = os.getenv('IG_GRAPH_BATCH_ENABLED', 'true').lower() == 'true'
+    IG_GRAPH_BATCH_SIZE = 50  # Graph's limit per batch call
+    IG_GRAPH_BATCH_WINDOW = 0.5  # seconds to collect lookups before sending
+    # Graph API policy: 'fallback' (Graph first, scrapers if it fails) or 'race' (both at once, first answer wins)
+    IG_GRAPH_API_POLICY = os.getenv('IG_GRAPH_API_POLICY', 'fallback').lower()
+    IG_GRAPH_RACE_RESERVE = 0.2  # only race while more than this share of the per-minute Graph quota is left
+    
+    # Profile cache for /insta, filled by every lookup including monitor checks
+    PROFILE_CACHE_SIZE = int(os.getenv('PROFILE_CACHE_SIZE', '1000'))  # 0 disables the cache
+    PROFILE_CACHE_TTL = 60  # seconds a found profile is served without refetching
+    PROFILE_CACHE_NOT_FOUND_TTL = 20  # seconds a 'not found' answer is served
+    PROFILE_CACHE_STALE_TTL = 600  # seconds past the TTL a stale answer may still be served
+    PROFILE_CACHE_SWR = os.getenv('PROFILE_CACHE_SWR', 'true').lower() == 'true'  # serve stale, refresh in background
     
     # Database Configuration
     DATABASE_NAME = 'monitor_logs.db'
@@ -49,12 +86,44 @@ class Config:
     MONITOR_ACCOUNT_DELAY = (10, 20)
     MAX_CONCURRENT_MONITORS = 50
     MONITOR_TIMEOUT = 300
+    # Routine checks only probe existence; the full profile is fetched when a ban/unban is
+    # suspected or the last full profile is older than MONITOR_FULL_PROFILE_MAX_AGE
+    MONITOR_PROBE_CHECKS = os.getenv('MONITOR_PROBE_CHECKS', 'true').lower() == 'true'
+    MONITOR_FULL_PROFILE_MAX_AGE = 3600  # seconds
+    # Failed checks return at once and are rescheduled after API_RETRY_DELAY (doubling, up to
+    # API_RETRY_ATTEMPTS tries) instead of sleeping in the API client and holding a worker
+    MONITOR_NONBLOCKING_RETRIES = os.getenv('MONITOR_NONBLOCKING_RETRIES', 'true').lower() == 'true'
+    # Monitor engine: 'concurrent' (bounded worker pool) or 'sequential' (one account at a time)
+    MONITOR_ENGINE = os.getenv('MONITOR_ENGINE', 'concurrent').lower()
+    
+    # Alert Delivery Configuration
+    ALERT_SENDER_COUNT = 4  # sender tasks; each channel always maps to the same sender
+    ALERT_QUEUE_SIZE = 500  # pending alerts per sender before checks wait on delivery
+    ALERT_MAX_RETRIES = 3
+    ALERT_RETRY_DELAY = 2  # seconds, doubled per retry when Discord gives no Retry-After
+    ALERT_DRAIN_TIMEOUT = 10  # seconds to flush pending alerts on shutdown
     
     # Proxy Configuration
     PROXY_TIMEOUT = 10
     PROXY_TEST_URL = "https://httpbin.org/ip"
-    MAX_PROXY_FAILURES = 3
-    PROXY_RETRY_DELAY = 30
+    MAX_PROXY_FAILURES = 3  # failures in a row before a proxy is quarantined
+    PROXY_RETRY_DELAY = 30  # first quarantine re-test delay, doubled per failed re-test
+    PROXY_MAX_RETEST_DELAY = 3600
+    PROXY_HEALTH_CHECK_INTERVAL = 600  # seconds between checks of an active proxy without traffic
+    PROXY_HEALTH_CHECK_CONCURRENCY = 20
+    PROXY_HEALTH_CHECK_TICK = 10  # seconds between health checker passes
+    PROXY_IMPORT_CONCURRENCY = 50  # proxies validated at once by /importproxies
+    PROXY_IMPORT_MAX = 5000  # proxies per /importproxies list
+    PROXY_IMPORT_PROGRESS_INTERVAL = 2  # seconds between progress embed edits
+    # Proxied requests use one keep-alive pool per proxy so tunnels survive between checks
+    PROXY_POOL_MAX_SESSIONS = 50  # least recently used proxy pools are closed beyond this
+    PROXY_POOL_IDLE_TIMEOUT = 120  # seconds before an unused proxy pool is closed
+    PROXY_POOL_MIN_CONNECTIONS = 2  # per-proxy connection limit, sized from observed concurrency
+    PROXY_POOL_MAX_CONNECTIONS = 16
+    # Keep sending a proxy's requests to the API URL it last succeeded on, reusing its tunnel
+    PROXY_ENDPOINT_AFFINITY = os.getenv('PROXY_ENDPOINT_AFFINITY', 'true').lower() == 'true'
+    PROXY_STATS_ALPHA = 0.2  # weight of the newest result in a proxy's decaying success/latency averages
+    PROXY_MIN_WEIGHT = 0.01  # selection weight floor so a struggling proxy is still sampled now and then
     
     # Logging Configuration
     LOG_LEVEL = 'INFO'
@@ -63,9 +132,23 @@ class Config:
     MAX_LOG_SIZE = 10 * 1024 * 1024
     LOG_BACKUP_COUNT = 5
     
-    # Rate Limiting
-    RATE_LIMIT_REQUESTS_PER_MINUTE = int(os.getenv('RATE_LIMIT_REQUESTS_PER_MINUTE', '30'))
+    # Rate Limiting - a request waits only for the budgets it consumes:
+    # global, its API URL and its proxy or the direct connection (Graph calls also use GraphQuotaManager)
+    RATE_LIMIT_REQUESTS_PER_MINUTE = int(os.getenv('RATE_LIMIT_REQUESTS_PER_MINUTE', '30'))  # per API URL
     RATE_LIMIT_BURST = 10
+    RATE_LIMIT_GLOBAL_RPM = int(os.getenv('RATE_LIMIT_GLOBAL_RPM', '0'))  # 0 = no global cap
+    RATE_LIMIT_GLOBAL_BURST = 20
+    RATE_LIMIT_PER_PROXY_RPM = int(os.getenv('RATE_LIMIT_PER_PROXY_RPM', '60'))
+    RATE_LIMIT_PER_PROXY_BURST = 10
+    RATE_LIMIT_DIRECT_RPM = int(os.getenv('RATE_LIMIT_DIRECT_RPM', '0'))  # requests without a proxy; 0 = no cap
+    RATE_LIMIT_DIRECT_BURST = 10
+    # Adaptive (AIMD) URL and proxy budgets: cut on 429/5xx, probe back up on sustained success
+    RATE_LIMIT_ADAPTIVE = os.getenv('RATE_LIMIT_ADAPTIVE', 'true').lower() == 'true'
+    RATE_LIMIT_DECREASE_FACTOR = 0.5  # rate multiplier on a throttled response
+    RATE_LIMIT_INCREASE_STEP = 1  # rpm added after a run of successes
+    RATE_LIMIT_INCREASE_AFTER = 10  # successes in a row before probing upward
+    RATE_LIMIT_MIN_RPM = 2
+    RATE_LIMIT_MAX_FACTOR = 2.0  # never adapt above this multiple of the configured rate
     
     # Error Handling
     MAX_CONSECUTIVE_ERRORS = 5
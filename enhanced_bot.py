@@ -5,7 +5,7 @@ import asyncio
 import logging
 import random
 import time
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Optional
 
 import discord
@@ -27,9 +27,10 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Initialize components
+# Initialize components; one API client (connection pool, URL health, rate limits) shared by all commands
 db = EnhancedDatabaseManager()
-monitor = EnhancedInstagramMonitor(db)
+api_client = APIClient()
+monitor = EnhancedInstagramMonitor(db, api_client)
 
 # Discord bot setup
 intents = discord.Intents.default()
@@ -44,6 +45,28 @@ def is_discord_authorized(user_id: int) -> bool:
     """Check if user is authorized to use the bot"""
     return db.is_user_authorized(user_id)
 
+def make_send_func(channel: discord.abc.Messageable):
+    """Build the alert send function for a channel"""
+    async def send_func(embed=None, message=None):
+        if embed:
+            await channel.send(embed=embed)
+        else:
+            await channel.send(message)
+    return send_func
+
+async def resolve_channel_send_func(channel_id: int):
+    """Resolve a stored channel id to a send function, or None if it is gone"""
+    channel = bot.get_channel(channel_id)
+    if channel is None:
+        try:
+            channel = await bot.fetch_channel(channel_id)
+        except discord.HTTPException as e:
+            logger.warning(f"Cannot restore monitors for channel {channel_id}: {e}")
+            return None
+    return make_send_func(channel)
+
+monitors_restored = False
+
 @bot.event
 async def on_ready():
     """Bot ready event"""
@@ -54,6 +77,13 @@ async def on_ready():
     # Update user last used time
     db.update_user_last_used(Config.DISCORD_OWNER_ID)
 
+    # on_ready fires again after reconnects, so only rehydrate monitors once
+    global monitors_restored
+    if not monitors_restored:
+        monitors_restored = True
+        await monitor.restore_monitors(resolve_channel_send_func)
+        monitor.start_proxy_health_checks()
+
 @bot.event
 async def on_command_error(ctx, error):
     """Global error handler"""
@@ -98,6 +128,66 @@ async def add_proxy_command(ctx, *, proxy_url: str = None):
     else:
         await ctx.send(f"⚠️ Proxy `{proxy_url}` already exists.", ephemeral=True)
 
+def import_progress_embed(result: dict, invalid: int, done: bool = False) -> discord.Embed:
+    """Build the /importproxies progress embed"""
+    embed = discord.Embed(
+        title="✅ Proxy Import Complete" if done else "🔍 Importing Proxies",
+        description=f"Validated {result['checked']}/{result['total']} against `{Config.PROXY_TEST_URL}`",
+        color=0x00FF7F if done else 0x4169E1
+    )
+    embed.add_field(name="Added", value=f"🟢 {result['passed']}", inline=True)
+    embed.add_field(name="Failed", value=f"🔴 {result['failed']}", inline=True)
+    embed.add_field(name="Skipped", value=f"{result['duplicates']} duplicate, {invalid} invalid", inline=True)
+    if done:
+        embed.add_field(name="Total Proxies", value=f"{len(monitor.proxy_manager.proxies)}", inline=True)
+    return embed
+
+@bot.command(name='importproxies')
+async def import_proxies_command(ctx, *, path: str = None):
+    """Validate and add a list of proxies from an attached file or a local path (owner only)"""
+    if not is_discord_authorized(ctx.author.id):
+        await ctx.send("❌ You are not authorized to use this bot.", ephemeral=True)
+        return
+
+    if ctx.message.attachments:
+        try:
+            text = (await ctx.message.attachments[0].read()).decode('utf-8', errors='ignore')
+        except discord.HTTPException as e:
+            await ctx.send(f"❌ Could not read attachment: {e}", ephemeral=True)
+            return
+    elif path:
+        if not is_discord_owner(ctx.author.id):
+            await ctx.send("❌ Only the owner can import from a local path.", ephemeral=True)
+            return
+        try:
+            with open(path, encoding='utf-8', errors='ignore') as f:
+                text = f.read()
+        except OSError as e:
+            await ctx.send(f"❌ Could not read `{path}`: {e}", ephemeral=True)
+            return
+    else:
+        await ctx.send("❌ **Usage:** `/importproxies` with a proxy list attached (one per line), or `/importproxies <path>` (owner only)", ephemeral=True)
+        return
+
+    proxy_urls, invalid = monitor.proxy_manager.parse_proxy_list(text)
+    if len(proxy_urls) > Config.PROXY_IMPORT_MAX:
+        await ctx.send(f"❌ Too many proxies ({len(proxy_urls)}), the limit is {Config.PROXY_IMPORT_MAX} per import.", ephemeral=True)
+        return
+
+    empty = {'total': 0, 'checked': 0, 'passed': 0, 'failed': 0, 'duplicates': 0}
+    progress_msg = await ctx.send(embed=import_progress_embed(empty, len(invalid)))
+    last_edit = time.monotonic()
+
+    async def report(result: dict):
+        # Discord rate-limits message edits; report at most every PROXY_IMPORT_PROGRESS_INTERVAL
+        nonlocal last_edit
+        if time.monotonic() - last_edit >= Config.PROXY_IMPORT_PROGRESS_INTERVAL:
+            last_edit = time.monotonic()
+            await progress_msg.edit(embed=import_progress_embed(result, len(invalid)))
+
+    result = await monitor.proxy_manager.import_proxies(proxy_urls, api_client, report)
+    await progress_msg.edit(embed=import_progress_embed(result, len(invalid), done=True))
+
 @bot.command(name='removeproxy')
 async def remove_proxy_command(ctx, *, proxy_url: str = None):
     """Remove a proxy from the rotation"""
@@ -158,12 +248,13 @@ async def list_proxies_command(ctx):
     if failed_proxies:
         failed_list = []
         for p in failed_proxies[:5]:  # Limit to 5 for display
-            failed_list.append(f"🔴 `{p['proxy']}` - {p['success_rate']:.1f}%")
+            retest = f" - re-test in {p['retest_in']:.0f}s" if p['retest_in'] is not None else ""
+            failed_list.append(f"🔴 `{p['proxy']}` - {p['success_rate']:.1f}%{retest}")
         
         if len(failed_proxies) > 5:
             failed_list.append(f"... and {len(failed_proxies) - 5} more")
         
-        embed.add_field(name=f"Failed Proxies ({len(failed_proxies)})", value="\n".join(failed_list), inline=False)
+        embed.add_field(name=f"Quarantined Proxies ({len(failed_proxies)})", value="\n".join(failed_list), inline=False)
 
     embed.set_footer(text=f"Total: {len(proxies)} proxies")
     await ctx.send(embed=embed)
@@ -187,25 +278,24 @@ async def test_proxy_command(ctx, *, proxy_url: str = None):
     loading_msg = await ctx.send(embed=embed)
 
     # Test the proxy
-    async with APIClient() as api_client:
-        response = await api_client.test_proxy(proxy_url)
-        
-        if response.success:
-            embed = discord.Embed(
-                title="✅ Proxy Test Successful",
-                color=0x00FF7F
-            )
-            embed.add_field(name="Proxy", value=f"`{proxy_url}`", inline=False)
-            embed.add_field(name="Response Time", value=f"{response.response_time:.2f}s", inline=True)
-            embed.add_field(name="External IP", value=f"`{response.data.get('external_ip', 'Unknown')}`", inline=True)
-            embed.add_field(name="Status", value="🟢 Working", inline=True)
-        else:
-            embed = discord.Embed(
-                title="❌ Proxy Test Failed",
-                description=response.error or "Unknown error",
-                color=0xFF0000
-            )
-            embed.add_field(name="Proxy", value=f"`{proxy_url}`", inline=False)
+    response = await api_client.test_proxy(proxy_url)
+
+    if response.success:
+        embed = discord.Embed(
+            title="✅ Proxy Test Successful",
+            color=0x00FF7F
+        )
+        embed.add_field(name="Proxy", value=f"`{proxy_url}`", inline=False)
+        embed.add_field(name="Response Time", value=f"{response.response_time:.2f}s", inline=True)
+        embed.add_field(name="External IP", value=f"`{response.data.get('external_ip', 'Unknown')}`", inline=True)
+        embed.add_field(name="Status", value="🟢 Working", inline=True)
+    else:
+        embed = discord.Embed(
+            title="❌ Proxy Test Failed",
+            description=response.error or "Unknown error",
+            color=0xFF0000
+        )
+        embed.add_field(name="Proxy", value=f"`{proxy_url}`", inline=False)
 
     await loading_msg.edit(embed=embed)
 
@@ -223,8 +313,8 @@ async def ban_monitor_command(ctx, username: str = None):
 
     username = username.strip().replace('@', '')
     
-    if username in monitor.monitoring_tasks:
-        await ctx.send(f"⚠️ **Already monitoring @{username}**", ephemeral=True)
+    if monitor.is_subscribed(username, ctx.channel.id, 'ban'):
+        await ctx.send(f"⚠️ **Already monitoring @{username} in this channel**", ephemeral=True)
         return
 
     embed = discord.Embed(
@@ -234,8 +324,9 @@ async def ban_monitor_command(ctx, username: str = None):
     )
     loading_msg = await ctx.send(embed=embed)
 
-    # Check current account status
-    async with APIClient() as api_client:
+    # Reuse the polled state if the account is already monitored, otherwise check it
+    current_status = monitor.get_known_status(username)
+    if current_status is None:
         user_data_response = await api_client.get_instagram_profile(username)
         current_status = user_data_response.data.get('st')
 
@@ -263,22 +354,18 @@ async def ban_monitor_command(ctx, username: str = None):
     )
     await loading_msg.edit(embed=embed)
 
-    async def send_func(embed=None, message=None):
-        if embed:
-            await ctx.send(embed=embed)
-        else:
-            await ctx.send(message)
+    send_func = make_send_func(ctx.channel)
 
-    success = await monitor.start_monitoring(username, 'ban', send_func, current_status, ctx.author.id)
+    success = await monitor.start_monitoring(username, 'ban', send_func, current_status, ctx.author.id, ctx.channel.id)
 
     if success:
         success_embed = discord.Embed(
             title="🟢 Enhanced Monitor Active",
-            description=f"Now monitoring **@{username}** for bans\n⚡ Enhanced sequential monitoring with better error handling",
+            description=f"Now monitoring **@{username}** for bans\n⚡ Enhanced {Config.MONITOR_ENGINE} monitoring with better error handling",
             color=0x00FF7F
         )
-        success_embed.add_field(name="Queue Position", value=f"{len(monitor.monitor_queue)}", inline=True)
-        success_embed.add_field(name="Total Monitoring", value=f"{len(monitor.monitoring_tasks)}", inline=True)
+        success_embed.add_field(name="Queue Position", value=f"{len(monitor.registry)}", inline=True)
+        success_embed.add_field(name="Total Monitoring", value=f"{len(monitor.registry)}", inline=True)
         success_embed.add_field(name="Proxy Count", value=f"{len(monitor.proxy_manager.proxies)}", inline=True)
         await loading_msg.edit(embed=success_embed)
     else:
@@ -301,8 +388,8 @@ async def unban_monitor_command(ctx, username: str = None):
 
     username = username.strip().replace('@', '')
     
-    if username in monitor.monitoring_tasks:
-        await ctx.send(f"⚠️ **Already monitoring @{username}**", ephemeral=True)
+    if monitor.is_subscribed(username, ctx.channel.id, 'unban'):
+        await ctx.send(f"⚠️ **Already monitoring @{username} in this channel**", ephemeral=True)
         return
 
     embed = discord.Embed(
@@ -312,8 +399,9 @@ async def unban_monitor_command(ctx, username: str = None):
     )
     loading_msg = await ctx.send(embed=embed)
 
-    # Check current account status
-    async with APIClient() as api_client:
+    # Reuse the polled state if the account is already monitored, otherwise check it
+    current_status = monitor.get_known_status(username)
+    if current_status is None:
         user_data_response = await api_client.get_instagram_profile(username)
         current_status = user_data_response.data.get('st')
 
@@ -341,22 +429,18 @@ async def unban_monitor_command(ctx, username: str = None):
     )
     await loading_msg.edit(embed=embed)
 
-    async def send_func(embed=None, message=None):
-        if embed:
-            await ctx.send(embed=embed)
-        else:
-            await ctx.send(message)
+    send_func = make_send_func(ctx.channel)
 
-    success = await monitor.start_monitoring(username, 'unban', send_func, current_status, ctx.author.id)
+    success = await monitor.start_monitoring(username, 'unban', send_func, current_status, ctx.author.id, ctx.channel.id)
 
     if success:
         success_embed = discord.Embed(
             title="🟢 Enhanced Monitor Active",
-            description=f"Now monitoring **@{username}** for recovery\n⚡ Enhanced sequential monitoring with better error handling",
+            description=f"Now monitoring **@{username}** for recovery\n⚡ Enhanced {Config.MONITOR_ENGINE} monitoring with better error handling",
             color=0x00FF7F
         )
-        success_embed.add_field(name="Queue Position", value=f"{len(monitor.monitor_queue)}", inline=True)
-        success_embed.add_field(name="Total Monitoring", value=f"{len(monitor.monitoring_tasks)}", inline=True)
+        success_embed.add_field(name="Queue Position", value=f"{len(monitor.registry)}", inline=True)
+        success_embed.add_field(name="Total Monitoring", value=f"{len(monitor.registry)}", inline=True)
         success_embed.add_field(name="Proxy Count", value=f"{len(monitor.proxy_manager.proxies)}", inline=True)
         await loading_msg.edit(embed=success_embed)
     else:
@@ -375,7 +459,7 @@ async def stop_monitor_command(ctx, username: str = None):
 
     if username:
         username = username.strip().replace('@', '')
-        if monitor.stop_monitoring(username):
+        if monitor.stop_monitoring(username, ctx.channel.id):
             embed = discord.Embed(
                 title="⏹️ Monitor Stopped",
                 description=f"Stopped monitoring **@{username}**",
@@ -383,14 +467,17 @@ async def stop_monitor_command(ctx, username: str = None):
             )
             await ctx.send(embed=embed)
         else:
-            await ctx.send(f"❌ **No active monitoring for @{username}**", ephemeral=True)
+            await ctx.send(f"❌ **No active monitoring for @{username} in this channel**", ephemeral=True)
     else:
-        active_monitors = list(monitor.monitoring_tasks.keys())
+        active_monitors = list(monitor.registry)
         if active_monitors:
             embed = discord.Embed(title="📊 Active Monitors", color=0x00AAFF)
-            monitor_list = "\n".join([f"⚡ @{monitor_name}" for monitor_name in active_monitors])
+            monitor_list = "\n".join([
+                f"⚡ @{monitor_data.username} ({monitor_data.monitor_type}, {len(monitor_data.subscribers)} subscribers)"
+                for monitor_data in active_monitors
+            ])
             embed.add_field(name="Currently Monitoring:", value=monitor_list, inline=False)
-            embed.add_field(name="Queue Size", value=f"{len(monitor.monitor_queue)}", inline=True)
+            embed.add_field(name="Queue Size", value=f"{len(monitor.registry)}", inline=True)
             embed.add_field(name="Total Proxies", value=f"{len(monitor.proxy_manager.proxies)}", inline=True)
             embed.add_field(name="Active Proxies", value=f"{len(monitor.proxy_manager.proxies) - len(monitor.proxy_manager.failed_proxies)}", inline=True)
             await ctx.send(embed=embed)
@@ -418,15 +505,14 @@ async def insta_info_command(ctx, username: str = None):
     )
     loading_msg = await ctx.send(embed=loading_embed)
 
-    # Try with proxy first, then without if it fails
+    # Try with proxy first, then without if it fails; watched accounts are usually answered from the cache
     proxy_url = monitor.proxy_manager.get_next_proxy()
     
-    async with APIClient() as api_client:
-        user_data_response = await api_client.get_instagram_profile(username, proxy_url)
-        
-        if user_data_response.data.get('st') == 'proxy_error' and proxy_url:
-            logger.info(f"Proxy failed for {username}, retrying without proxy")
-            user_data_response = await api_client.get_instagram_profile(username)
+    user_data_response = await api_client.get_cached_profile(username, proxy_url)
+
+    if user_data_response.data.get('st') == 'proxy_error' and proxy_url:
+        logger.info(f"Proxy failed for {username}, retrying without proxy")
+        user_data_response = await api_client.get_instagram_profile(username)
 
     status = user_data_response.data.get('st')
 
@@ -458,8 +544,14 @@ async def insta_info_command(ctx, username: str = None):
         elif proxy_url and user_data_response.data.get('st') != 'proxy_error':
             api_used = "Proxy"
         
+        fetched_at = datetime.now() - timedelta(seconds=user_data_response.cache_age)
+        fetched = fetched_at.strftime('%H:%M:%S')
+        if user_data_response.from_cache:
+            api_used += " (cached)"
+            fetched += f" ({int(user_data_response.cache_age)}s ago)"
+        
         embed.add_field(name="🔧 Method", value=api_used, inline=True)
-        embed.add_field(name="⏰ Fetched", value=datetime.now().strftime('%H:%M:%S'), inline=True)
+        embed.add_field(name="⏰ Fetched", value=fetched, inline=True)
 
         embed.set_footer(text="Instagram Monitor • Enhanced API • Real-time Data", icon_url="https://upload.wikimedia.org/wikipedia/commons/thumb/a/a5/Instagram_icon.png/600px-Instagram_icon.png")
         await loading_msg.edit(embed=embed)
@@ -493,8 +585,6 @@ async def api_urls_command(ctx):
         timestamp=datetime.now()
     )
     
-    # Get API client from monitor
-    api_client = await monitor._get_api_client()
     url_stats = api_client.get_url_stats()
     
     if not url_stats:
@@ -516,15 +606,22 @@ async def api_urls_command(ctx):
             
             success_rate = f"{url_stat['success_rate']:.1f}%"
             response_time = f"{url_stat['avg_response_time']:.2f}s"
+            if url_stat['ewma_latency'] is not None:
+                response_time += f" (recent {url_stat['ewma_latency']:.2f}s, {url_stat['in_flight']} in flight)"
             success_count = url_stat['success_count']
             failure_count = url_stat['failure_count']
+            rate_limit = url_stat['rate_limit']
             
             status_emoji = "🟢"
             field_value = (
                 f"Success Rate: **{success_rate}**\n"
                 f"Avg Response: **{response_time}**\n"
-                f"Requests: {success_count} ✅ / {failure_count} ❌"
+                f"Requests: {success_count} ✅ / {failure_count} ❌\n"
+                f"Rate: **{rate_limit['effective_rpm']:.1f}**/{rate_limit['configured_rpm']} rpm"
+                f" ({rate_limit['throttle_count']} throttled)"
             )
+            if rate_limit['blocked_for'] > 0:
+                field_value += f"\nRetry-After: **{rate_limit['blocked_for']:.0f}s**"
             
             embed.add_field(
                 name=f"{status_emoji} API #{i}: {display_url}",
@@ -541,7 +638,12 @@ async def api_urls_command(ctx):
             if len(display_url) > 40:
                 display_url = display_url[:37] + '...'
             failures = url_stat['consecutive_failures']
-            inactive_list.append(f"🔴 {display_url} ({failures} consecutive failures)")
+            if url_stat['circuit_state'] == 'half_open':
+                inactive_list.append(f"🟡 {display_url} (probing, {failures} consecutive failures)")
+            else:
+                inactive_list.append(
+                    f"🔴 {display_url} ({failures} consecutive failures, probe in {url_stat['probe_in']:.0f}s)"
+                )
         
         if inactive_list:
             embed.add_field(
@@ -556,17 +658,48 @@ async def api_urls_command(ctx):
     total_failure = sum(u['failure_count'] for u in url_stats)
     total_requests = total_success + total_failure
     overall_success_rate = (total_success / total_requests * 100) if total_requests > 0 else 0
+    cache_stats = api_client.profile_cache.get_stats()
+    batch_stats = api_client.graph_batcher.get_stats()
+    quota_stats = api_client.graph_quota.get_stats()
+    pool_stats = api_client.proxy_sessions.get_stats()
     
     embed.add_field(
         name="📊 Overall Statistics",
         value=(
             f"Total URLs: **{total_urls}** ({len(active_urls)} active)\n"
             f"Total Requests: **{total_requests:,}**\n"
-            f"Success Rate: **{overall_success_rate:.1f}%**"
+            f"Success Rate: **{overall_success_rate:.1f}%**\n"
+            f"Coalesced Lookups: **{api_client.coalesced_requests:,}**\n"
+            f"Hedged Requests: **{api_client.hedged_requests:,}** ({api_client.hedge_wins:,} won)\n"
+            f"Graph/Scraper Race Wins: **{api_client.race_wins['graph']:,}** / **{api_client.race_wins['scraper']:,}**\n"
+            f"Profile Cache: **{cache_stats['hits']:,}** hits, {cache_stats['stale_hits']:,} stale, "
+            f"{cache_stats['misses']:,} misses ({cache_stats['size']:,} cached)\n"
+            f"Graph Batches: **{batch_stats['batches']:,}** ({batch_stats['batched_lookups']:,} lookups)\n"
+            f"Graph Quota: **{quota_stats['usage']:.0f}%** used, {quota_stats['graph_calls']:,} calls, "
+            f"{quota_stats['routed_to_scrapers']:,} routed to scrapers"
+            + (f", paused {quota_stats['blocked_for']:.0f}s" if quota_stats['blocked_for'] > 0 else "")
+            + f"\nProxy Pools: **{pool_stats['pools']}** open ({pool_stats['connections']} connections), "
+            f"{pool_stats['reused']:,} reused, {pool_stats['created']:,} opened, {pool_stats['evicted']:,} evicted"
         ),
         inline=False
     )
     
+    # Adaptive proxy rates, most throttled first
+    proxy_rates = api_client.get_rate_limit_stats()['proxies']
+    throttled = sorted(
+        ((proxy, stats) for proxy, stats in proxy_rates.items() if stats['configured_rpm'] > 0),
+        key=lambda item: item[1]['effective_rpm'] / item[1]['configured_rpm']
+    )
+    if throttled:
+        embed.add_field(
+            name="🚦 Proxy Rates",
+            value="\n".join(
+                f"`{proxy.split('@')[-1][:30]}`: **{stats['effective_rpm']:.1f}**/{stats['configured_rpm']} rpm"
+                for proxy, stats in throttled[:5]
+            ),
+            inline=False
+        )
+    
     embed.set_footer(
         text="API URL health is tracked automatically",
         icon_url="https://upload.wikimedia.org/wikipedia/commons/thumb/a/a5/Instagram_icon.png/600px-Instagram_icon.png"
@@ -679,7 +812,7 @@ async def stats_command(ctx):
     # Monitoring stats
     embed.add_field(
         name="🔍 Monitoring",
-        value=f"Active: {monitor_stats['active_monitors']}\nQueue: {monitor_stats['queue_size']}\nBans Detected: {monitor_stats['bans_detected']}\nUnbans Detected: {monitor_stats['unbans_detected']}",
+        value=f"Active: {monitor_stats['active_monitors']}\nQueue: {monitor_stats['queue_size']}\nEngine: {monitor_stats['engine']}\nBans Detected: {monitor_stats['bans_detected']}\nUnbans Detected: {monitor_stats['unbans_detected']}",
         inline=True
     )
     
@@ -688,7 +821,7 @@ async def stats_command(ctx):
     success_rate = (monitor_stats['successful_checks'] / total_checks * 100) if total_checks > 0 else 0
     embed.add_field(
         name="🌐 API Performance",
-        value=f"Total Checks: {total_checks:,}\nSuccess Rate: {success_rate:.1f}%\nProxy Errors: {monitor_stats['proxy_errors']}\nAPI Errors: {monitor_stats['api_errors']}",
+        value=f"Total Checks: {total_checks:,}\nSuccess Rate: {success_rate:.1f}%\nProxy Errors: {monitor_stats['proxy_errors']}\nAPI Errors: {monitor_stats['api_errors']}\nFull Profile Fetches: {monitor_stats['full_fetches']:,}",
         inline=True
     )
     
@@ -701,6 +834,14 @@ async def stats_command(ctx):
         inline=True
     )
     
+    # Alert delivery stats
+    alert_stats = monitor_stats['alerts']
+    embed.add_field(
+        name="🔔 Alerts",
+        value=f"Sent: {alert_stats['sent']}\nPending: {alert_stats['queue_depth']}\nRetried: {alert_stats['retried']}\nFailed: {alert_stats['failed']}\nBackpressure: {alert_stats['backpressure_waits']}",
+        inline=True
+    )
+    
     # Database stats
     embed.add_field(
         name="💾 Database",
@@ -716,7 +857,6 @@ async def stats_command(ctx):
         )
     
     # API URL count
-    api_client = await monitor._get_api_client()
     url_stats = api_client.get_url_stats()
     active_api_urls = len([u for u in url_stats if u['is_active']])
     embed.add_field(
@@ -753,7 +893,7 @@ async def list_commands(ctx):
 
     embed.add_field(
         name="🌐 Enhanced Proxy Management",
-        value="• `/addproxy <proxy_url>` - Add proxy\n• `/removeproxy <proxy_url>` - Remove proxy\n• `/listproxies` - List all proxies with stats\n• `/testproxy <proxy_url>` - Test proxy",
+        value="• `/addproxy <proxy_url>` - Add proxy\n• `/importproxies` + file - Validate and add a proxy list\n• `/removeproxy <proxy_url>` - Remove proxy\n• `/listproxies` - List all proxies with stats\n• `/testproxy <proxy_url>` - Test proxy",
         inline=False
     )
 
@@ -779,7 +919,7 @@ async def list_commands(ctx):
             "• Enhanced logging and monitoring\n"
             "• Database connection pooling\n"
             "• Rate limiting and cooldown periods\n"
-            f"• Official IG Graph API: {'ON' if Config.IG_GRAPH_API_ENABLED else 'OFF'} (falls back to legacy)\n"
+            f"• Official IG Graph API: {'ON' if Config.IG_GRAPH_API_ENABLED else 'OFF'} ({'races' if Config.IG_GRAPH_API_POLICY == 'race' else 'falls back to'} legacy)\n"
             "• Real-time statistics and monitoring\n"
             "• Automatic failover and health-based selection"
         ),
@@ -805,6 +945,7 @@ async def main():
         logger.error(f"Failed to start Discord bot: {e}")
     finally:
         await monitor.cleanup()
+        await api_client._close_session()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -133,10 +133,32 @@ class EnhancedDatabaseManager:
                     status TEXT DEFAULT 'active',
                     check_count INTEGER DEFAULT 0,
                     user_id INTEGER,
+                    channel_id INTEGER,
+                    is_banned_state BOOLEAN DEFAULT 0,
+                    last_known_data TEXT,
                     FOREIGN KEY (user_id) REFERENCES authorized_users (user_id)
                 )
             ''')
             
+            # Columns added after the initial schema
+            self._add_missing_columns(cursor, 'monitoring_sessions', {
+                'channel_id': 'INTEGER',
+                'is_banned_state': 'BOOLEAN DEFAULT 0',
+                'last_known_data': 'TEXT'
+            })
+            # Pool membership and live proxy health; times are unix epoch seconds.
+            # in_pool is only set by set_proxy_in_pool, so rows left by proxies used before
+            # membership was persisted (possibly since removed) are not restored into the pool
+            self._add_missing_columns(cursor, 'proxy_stats', {
+                'in_pool': 'BOOLEAN DEFAULT 0',
+                'success_ewma': 'REAL',
+                'latency_ewma': 'REAL',
+                'consecutive_failures': 'INTEGER DEFAULT 0',
+                'quarantine_level': 'INTEGER',
+                'retest_at': 'REAL',
+                'last_checked': 'REAL'
+            })
+            
             # Create indexes for better performance
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_logs_username ON monitor_logs(username)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_logs_timestamp ON monitor_logs(timestamp)')
@@ -153,6 +175,14 @@ class EnhancedDatabaseManager:
             
             conn.commit()
     
+    def _add_missing_columns(self, cursor: sqlite3.Cursor, table: str, columns: Dict[str, str]):
+        """Add columns that an older database file does not have yet"""
+        cursor.execute(f'PRAGMA table_info({table})')
+        existing = {row['name'] for row in cursor.fetchall()}
+        for name, definition in columns.items():
+            if name not in existing:
+                cursor.execute(f'ALTER TABLE {table} ADD COLUMN {name} {definition}')
+    
     def is_user_authorized(self, user_id: int) -> bool:
         """Check if a user ID is authorized"""
         try:
@@ -244,15 +274,17 @@ class EnhancedDatabaseManager:
         except Exception as e:
             logger.error(f"Database logging error: {e}")
     
-    def start_monitoring_session(self, username: str, monitor_type: str, user_id: int) -> int:
+    def start_monitoring_session(self, username: str, monitor_type: str, user_id: int,
+                                 channel_id: Optional[int] = None, is_banned_state: bool = False) -> int:
         """Start a new monitoring session"""
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
-                    INSERT INTO monitoring_sessions (username, monitor_type, user_id)
-                    VALUES (?, ?, ?)
-                ''', (username, monitor_type, user_id))
+                    INSERT INTO monitoring_sessions
+                    (username, monitor_type, user_id, channel_id, is_banned_state, started_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (username, monitor_type, user_id, channel_id, is_banned_state, datetime.now()))
                 return cursor.lastrowid
         except Exception as e:
             logger.error(f"Error starting monitoring session: {e}")
@@ -284,18 +316,44 @@ class EnhancedDatabaseManager:
         except Exception as e:
             logger.error(f"Error updating session check count: {e}")
     
+    def update_sessions_state(self, check_counts: List[Tuple[int, int]], is_banned_state: bool,
+                              last_known_data: Optional[Dict[str, Any]] = None):
+        """Persist the polled state of an account for all of its sessions in one transaction"""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                last_known_json = json.dumps(last_known_data) if last_known_data else None
+                cursor.executemany('''
+                    UPDATE monitoring_sessions 
+                    SET check_count = ?, is_banned_state = ?,
+                        last_known_data = COALESCE(?, last_known_data)
+                    WHERE id = ?
+                ''', [
+                    (check_count, is_banned_state, last_known_json, session_id)
+                    for session_id, check_count in check_counts
+                ])
+        except Exception as e:
+            logger.error(f"Error updating session state: {e}")
+    
     def get_active_sessions(self) -> List[Dict[str, Any]]:
         """Get all active monitoring sessions"""
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
-                    SELECT id, username, monitor_type, started_at, check_count, user_id
+                    SELECT id, username, monitor_type, started_at, check_count, user_id,
+                           channel_id, is_banned_state, last_known_data
                     FROM monitoring_sessions
                     WHERE status = 'active'
                     ORDER BY started_at DESC
                 ''')
-                return [dict(row) for row in cursor.fetchall()]
+                sessions = []
+                for row in cursor.fetchall():
+                    session = dict(row)
+                    session['is_banned_state'] = bool(session['is_banned_state'])
+                    session['last_known_data'] = json.loads(session['last_known_data']) if session['last_known_data'] else None
+                    sessions.append(session)
+                return sessions
         except Exception as e:
             logger.error(f"Error getting active sessions: {e}")
             return []
@@ -326,6 +384,37 @@ class EnhancedDatabaseManager:
         except Exception as e:
             logger.error(f"Error updating proxy stats: {e}")
     
+    def set_proxy_in_pool(self, proxy_url: str, in_pool: bool):
+        """Add a proxy to the persisted pool or take it out, keeping its history"""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    INSERT INTO proxy_stats (proxy_url, in_pool)
+                    VALUES (?, ?)
+                    ON CONFLICT(proxy_url) DO UPDATE SET
+                        in_pool = excluded.in_pool,
+                        quarantine_level = NULL,
+                        retest_at = NULL
+                ''', (proxy_url, in_pool))
+        except Exception as e:
+            logger.error(f"Error updating proxy pool: {e}")
+    
+    def update_proxy_health(self, health: List[Tuple[float, float, int, Optional[int], Optional[float], Optional[float], str]]):
+        """Persist (success_ewma, latency_ewma, consecutive_failures, quarantine_level, retest_at,
+        last_checked, proxy_url) rows in one transaction"""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.executemany('''
+                    UPDATE proxy_stats
+                    SET success_ewma = ?, latency_ewma = ?, consecutive_failures = ?,
+                        quarantine_level = ?, retest_at = ?, last_checked = ?
+                    WHERE proxy_url = ?
+                ''', health)
+        except Exception as e:
+            logger.error(f"Error updating proxy health: {e}")
+    
     def get_proxy_stats(self) -> List[Dict[str, Any]]:
         """Get proxy statistics"""
         try:
@@ -333,7 +422,9 @@ class EnhancedDatabaseManager:
                 cursor = conn.cursor()
                 cursor.execute('''
                     SELECT proxy_url, success_count, failure_count, 
-                           last_success, last_failure, avg_response_time, is_active
+                           last_success, last_failure, avg_response_time, is_active,
+                           in_pool, success_ewma, latency_ewma, consecutive_failures,
+                           quarantine_level, retest_at, last_checked
                     FROM proxy_stats
                     ORDER BY (success_count - failure_count) DESC
                 ''')
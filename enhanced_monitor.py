@@ -2,12 +2,15 @@
 Enhanced Instagram Monitor with better error handling and monitoring capabilities
 """
 import asyncio
+import heapq
+import itertools
 import random
 import logging
-from typing import Dict, Any, Optional, List, Callable
+from typing import Dict, Any, Optional, List, Callable, Tuple, Awaitable, Set
 from datetime import datetime, timedelta
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import time
+from urllib.parse import urlparse
 import discord
 
 from api_client import APIClient, APIResponse
@@ -17,49 +20,513 @@ from config import Config
 logger = logging.getLogger(__name__)
 
 @dataclass
-class MonitorData:
-    """Data structure for monitoring information"""
-    username: str
+class MonitorSubscriber:
+    """A channel or user waiting for a ban or unban on a monitored account"""
+    channel_id: int
     monitor_type: str
     send_func: Callable
     start_time: datetime
+    user_id: int = 0
+    session_id: int = 0
+    start_check_count: int = 0
+
+@dataclass
+class MonitorData:
+    """Data structure for monitoring information (one polled account, many subscribers)"""
+    username: str
+    start_time: datetime
     is_banned_state: bool
+    subscribers: List[MonitorSubscriber] = field(default_factory=list)
     check_count: int = 0
     last_known_data: Optional[Dict[str, Any]] = None
-    session_id: int = 0
+    last_full_fetch: Optional[datetime] = None
     consecutive_errors: int = 0
+    retry_attempt: int = 0
+    retry_delay: Optional[float] = None  # overrides the next check delay after a transient failure
     last_check_time: Optional[datetime] = None
+    check_interval: Optional[Tuple[float, float]] = None
+    next_check_at: Optional[float] = None
+    
+    @property
+    def monitor_type(self) -> str:
+        """Get the monitor type, or 'mixed' when subscribers want both"""
+        types = {subscriber.monitor_type for subscriber in self.subscribers}
+        return types.pop() if len(types) == 1 else 'mixed'
+    
+    def get_subscriber(self, channel_id: int, monitor_type: str) -> Optional[MonitorSubscriber]:
+        """Find a channel's subscription of the given type"""
+        for subscriber in self.subscribers:
+            if subscriber.channel_id == channel_id and subscriber.monitor_type == monitor_type:
+                return subscriber
+        return None
+
+class MonitorScheduler:
+    """Min-heap of monitors keyed on their next-due time (monotonic clock)"""
+    
+    def __init__(self):
+        self._heap: List[Tuple[float, int, MonitorData]] = []
+        self._counter = itertools.count()
+        self._stale = 0
+        self._wakeup: Optional[asyncio.Event] = None
+    
+    def __len__(self) -> int:
+        return len(self._heap) - self._stale
+    
+    def _get_wakeup(self) -> asyncio.Event:
+        """Create the wakeup event lazily so it binds to the running loop"""
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        return self._wakeup
+    
+    def schedule(self, monitor_data: MonitorData, due: float):
+        """Schedule a monitor check at the given monotonic time"""
+        if monitor_data.next_check_at is not None:
+            self._stale += 1
+        
+        earliest = self.peek_due()
+        monitor_data.next_check_at = due
+        heapq.heappush(self._heap, (due, next(self._counter), monitor_data))
+        
+        # Wake the dispatcher if this check is due before the one it is waiting for
+        if earliest is None or due < earliest:
+            self._get_wakeup().set()
+    
+    def unschedule(self, monitor_data: MonitorData):
+        """Drop a monitor's pending check; its heap entry is discarded lazily"""
+        if monitor_data.next_check_at is not None:
+            monitor_data.next_check_at = None
+            self._stale += 1
+            if self._stale > 64 and self._stale > len(self._heap) // 2:
+                self._compact()
+    
+    def _compact(self):
+        """Rebuild the heap without stale entries"""
+        self._heap = [entry for entry in self._heap if entry[2].next_check_at == entry[0]]
+        heapq.heapify(self._heap)
+        self._stale = 0
+    
+    def _discard_stale(self):
+        """Pop stale entries off the top of the heap"""
+        while self._heap and self._heap[0][2].next_check_at != self._heap[0][0]:
+            heapq.heappop(self._heap)
+            self._stale -= 1
+    
+    def peek_due(self) -> Optional[float]:
+        """Get the due time of the earliest scheduled check"""
+        self._discard_stale()
+        return self._heap[0][0] if self._heap else None
+    
+    async def pop_due(self) -> MonitorData:
+        """Wait until the earliest check is due and return its monitor"""
+        wakeup = self._get_wakeup()
+        while True:
+            due = self.peek_due()
+            if due is not None:
+                delay = due - time.monotonic()
+                if delay <= 0:
+                    _, _, monitor_data = heapq.heappop(self._heap)
+                    monitor_data.next_check_at = None
+                    return monitor_data
+            
+            wakeup.clear()
+            try:
+                await asyncio.wait_for(wakeup.wait(), timeout=None if due is None else delay)
+            except asyncio.TimeoutError:
+                pass
+
+class MonitorRegistry:
+    """Indexed registry of active monitors (username -> MonitorData) plus their check schedule"""
+    
+    def __init__(self):
+        self._monitors: Dict[str, MonitorData] = {}
+        self.scheduler = MonitorScheduler()
+    
+    @staticmethod
+    def normalize(username: str) -> str:
+        """Normalize a username into its registry key"""
+        return username.replace('@', '').strip().lower()
+    
+    def __len__(self) -> int:
+        return len(self._monitors)
+    
+    def __contains__(self, username: str) -> bool:
+        return self.normalize(username) in self._monitors
+    
+    def __iter__(self):
+        return iter(list(self._monitors.values()))
+    
+    def get(self, username: str) -> Optional[MonitorData]:
+        """Get the monitor registered for a username"""
+        return self._monitors.get(self.normalize(username))
+    
+    def is_active(self, monitor_data: MonitorData) -> bool:
+        """Check whether this exact monitor entry is still registered"""
+        return self._monitors.get(self.normalize(monitor_data.username)) is monitor_data
+    
+    def add(self, monitor_data: MonitorData, due: Optional[float] = None) -> bool:
+        """Register a monitor and schedule its first check (now by default)"""
+        key = self.normalize(monitor_data.username)
+        if key in self._monitors:
+            return False
+        
+        self._monitors[key] = monitor_data
+        self.scheduler.schedule(monitor_data, time.monotonic() if due is None else due)
+        return True
+    
+    def remove(self, monitor_data: MonitorData) -> bool:
+        """Unregister a monitor and drop its pending check"""
+        if not self.is_active(monitor_data):
+            return False
+        
+        del self._monitors[self.normalize(monitor_data.username)]
+        self.scheduler.unschedule(monitor_data)
+        return True
+    
+    def reschedule(self, monitor_data: MonitorData, due: float):
+        """Schedule the next check for a monitor that is still registered"""
+        if self.is_active(monitor_data):
+            self.scheduler.schedule(monitor_data, due)
+    
+    async def pop_due(self) -> MonitorData:
+        """Wait for the next due monitor that is still registered"""
+        while True:
+            monitor_data = await self.scheduler.pop_due()
+            if self.is_active(monitor_data):
+                return monitor_data
+
+@dataclass
+class AlertJob:
+    """An alert waiting for delivery to a channel"""
+    channel_id: int
+    send_func: Callable
+    embed: discord.Embed
+    username: str
+    enqueued_at: float
+
+class AlertDispatcher:
+    """Bounded outbound alert queue delivered by dedicated sender tasks.
+
+    Channels are sharded over the senders, so alerts for one channel keep their order
+    while a slow or rate-limited channel only holds up its own shard.
+    """
+    
+    def __init__(self, sender_count: int = None, queue_size: int = None):
+        self.sender_count = max(1, sender_count or Config.ALERT_SENDER_COUNT)
+        self.queue_size = queue_size or Config.ALERT_QUEUE_SIZE
+        self.queues: List[asyncio.Queue] = []
+        self.sender_tasks = []
+        self.stats = {
+            'queued': 0,
+            'sent': 0,
+            'failed': 0,
+            'retried': 0,
+            'rate_limited': 0,
+            'backpressure_waits': 0,
+            'max_queue_depth': 0,
+            'max_delivery_delay': 0.0
+        }
+    
+    def start(self):
+        """Start the sender tasks (needs a running event loop)"""
+        if self.sender_tasks:
+            return
+        self.queues = [asyncio.Queue(maxsize=self.queue_size) for _ in range(self.sender_count)]
+        self.sender_tasks = [asyncio.create_task(self._sender(queue)) for queue in self.queues]
+    
+    async def enqueue(self, channel_id: int, send_func: Callable, embed: discord.Embed, username: str):
+        """Queue an alert, waiting only if this channel's shard is full"""
+        self.start()
+        queue = self.queues[hash(channel_id) % self.sender_count]
+        if queue.full():
+            self.stats['backpressure_waits'] += 1
+            logger.warning(f"Alert queue full, waiting to queue alert for {username}")
+        
+        await queue.put(AlertJob(channel_id, send_func, embed, username, time.monotonic()))
+        self.stats['queued'] += 1
+        self.stats['max_queue_depth'] = max(self.stats['max_queue_depth'], self.queue_depth())
+    
+    def queue_depth(self) -> int:
+        """Get the number of alerts waiting for delivery"""
+        return sum(queue.qsize() for queue in self.queues)
+    
+    async def _sender(self, queue: asyncio.Queue):
+        """Deliver alerts from one shard in order"""
+        while True:
+            job = await queue.get()
+            try:
+                await self._deliver(job)
+            finally:
+                queue.task_done()
+    
+    async def _deliver(self, job: AlertJob):
+        """Send one alert, retrying on Discord rate limits and server errors"""
+        for attempt in range(Config.ALERT_MAX_RETRIES + 1):
+            retry_after = None
+            try:
+                await job.send_func(embed=job.embed)
+                self.stats['sent'] += 1
+                delay = time.monotonic() - job.enqueued_at
+                self.stats['max_delivery_delay'] = max(self.stats['max_delivery_delay'], delay)
+                return
+            except discord.RateLimited as e:
+                self.stats['rate_limited'] += 1
+                retry_after = e.retry_after
+            except discord.HTTPException as e:
+                if e.status == 429:
+                    self.stats['rate_limited'] += 1
+                    retry_after = self._get_retry_after(e)
+                elif e.status < 500:
+                    self.stats['failed'] += 1
+                    logger.error(f"Alert for {job.username} to {job.channel_id} rejected: {e}")
+                    return
+            except Exception as e:
+                self.stats['failed'] += 1
+                logger.error(f"Error sending alert for {job.username} to {job.channel_id}: {e}")
+                return
+            
+            if attempt < Config.ALERT_MAX_RETRIES:
+                self.stats['retried'] += 1
+                await asyncio.sleep(retry_after or Config.ALERT_RETRY_DELAY * (2 ** attempt))
+        
+        self.stats['failed'] += 1
+        logger.error(f"Giving up on alert for {job.username} to {job.channel_id} after {Config.ALERT_MAX_RETRIES} retries")
+    
+    def _get_retry_after(self, error: discord.HTTPException) -> Optional[float]:
+        """Read the Retry-After header from a Discord error response"""
+        try:
+            return float(error.response.headers.get('Retry-After'))
+        except (AttributeError, TypeError, ValueError):
+            return None
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get delivery and backpressure metrics"""
+        return {**self.stats, 'queue_depth': self.queue_depth()}
+    
+    async def close(self):
+        """Flush pending alerts (bounded by ALERT_DRAIN_TIMEOUT) and stop the senders"""
+        if self.queues:
+            try:
+                await asyncio.wait_for(
+                    asyncio.gather(*(queue.join() for queue in self.queues)),
+                    timeout=Config.ALERT_DRAIN_TIMEOUT
+                )
+            except asyncio.TimeoutError:
+                logger.warning(f"Dropping {self.queue_depth()} undelivered alerts on shutdown")
+        for task in self.sender_tasks:
+            task.cancel()
+        self.sender_tasks = []
+
+class ProxyWeightTree:
+    """Fenwick tree of proxy weights: O(log n) weighted random selection and weight updates"""
+    
+    def __init__(self):
+        self.keys: List[str] = []
+        self.positions: Dict[str, int] = {}
+        self.weights: List[float] = []
+        self.tree: List[float] = [0.0]  # 1-based; node i covers positions (i - lowbit(i), i]
+    
+    def __len__(self) -> int:
+        return len(self.keys)
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self.positions
+    
+    def _prefix_sum(self, i: int) -> float:
+        """Sum the first i weights"""
+        total = 0.0
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+    
+    def add(self, key: str, weight: float):
+        """Append a key with its weight"""
+        if key in self.positions:
+            self.update(key, weight)
+            return
+        
+        self.keys.append(key)
+        self.weights.append(weight)
+        self.positions[key] = len(self.keys) - 1
+        i = len(self.keys)
+        self.tree.append(weight + self._prefix_sum(i - 1) - self._prefix_sum(i - (i & -i)))
+    
+    def update(self, key: str, weight: float):
+        """Change a key's weight"""
+        position = self.positions[key]
+        delta = weight - self.weights[position]
+        self.weights[position] = weight
+        i = position + 1
+        while i < len(self.tree):
+            self.tree[i] += delta
+            i += i & -i
+    
+    def remove(self, key: str):
+        """Remove a key, moving the last key into its slot (O(n), removals are rare)"""
+        position = self.positions.pop(key)
+        last_key = self.keys.pop()
+        last_weight = self.weights.pop()
+        if position < len(self.keys):
+            self.keys[position] = last_key
+            self.weights[position] = last_weight
+            self.positions[last_key] = position
+        self._rebuild()
+    
+    def _rebuild(self):
+        """Rebuild the tree from the weights in O(n)"""
+        self.tree = [0.0] + list(self.weights)
+        for i in range(1, len(self.tree)):
+            parent = i + (i & -i)
+            if parent < len(self.tree):
+                self.tree[parent] += self.tree[i]
+    
+    def total(self) -> float:
+        """Get the sum of all weights"""
+        return self._prefix_sum(len(self.keys))
+    
+    def sample(self) -> Optional[str]:
+        """Pick a key with probability proportional to its weight, or None if all weights are zero"""
+        total = self.total()
+        if total <= 1e-9:
+            return None
+        
+        # Descend the tree to the first position whose prefix sum exceeds the target
+        target = random.random() * total
+        position = 0
+        step = 1 << len(self.keys).bit_length()
+        while step:
+            node = position + step
+            if node < len(self.tree) and self.tree[node] <= target:
+                position = node
+                target -= self.tree[node]
+            step >>= 1
+        return self.keys[min(position, len(self.keys) - 1)]
 
 class EnhancedProxyManager:
     """Enhanced proxy manager with statistics and health monitoring"""
     
     def __init__(self, db_manager: EnhancedDatabaseManager):
         self.proxies = []
-        self.current_proxy_index = 0
         self.failed_proxies = set()
         self.db_manager = db_manager
         self.proxy_stats = {}
+        self.weights = ProxyWeightTree()
+        # Quarantined proxies (also in failed_proxies): re-test level and monotonic re-test time
+        self.quarantine: Dict[str, Dict[str, float]] = {}
+        self.last_checked: Dict[str, float] = {}
+        # Proxies whose live health changed since the last flush_health()
+        self.dirty: Set[str] = set()
         self._load_proxy_stats()
     
     def _load_proxy_stats(self):
-        """Load proxy statistics from database"""
+        """Load proxy statistics from database and warm-start the persisted pool with them"""
         try:
             stats = self.db_manager.get_proxy_stats()
+            now, wall_now = time.monotonic(), time.time()
             for stat in stats:
-                self.proxy_stats[stat['proxy_url']] = stat
+                proxy_url = stat['proxy_url']
+                self.proxy_stats[proxy_url] = self._with_live_stats(stat)
+                if not stat['in_pool']:
+                    continue
+                # Stored wall-clock times are carried over onto the monotonic clock
+                if stat['last_checked'] is not None:
+                    self.last_checked[proxy_url] = now - max(0.0, wall_now - stat['last_checked'])
+                if stat['quarantine_level'] is not None:
+                    self.quarantine[proxy_url] = {
+                        'level': stat['quarantine_level'],
+                        'retest_at': now + max(0.0, (stat['retest_at'] or wall_now) - wall_now)
+                    }
+                    self.failed_proxies.add(proxy_url)
+                self.proxies.append(proxy_url)
+                self.weights.add(proxy_url, self._proxy_weight(proxy_url))
+            if self.proxies:
+                logger.info(f"Restored {len(self.proxies)} proxies ({len(self.quarantine)} quarantined)")
         except Exception as e:
             logger.error(f"Error loading proxy stats: {e}")
     
-    def add_proxy(self, proxy_url: str) -> bool:
-        """Add a proxy to the list"""
-        if proxy_url not in self.proxies:
-            self.proxies.append(proxy_url)
-            self.proxy_stats[proxy_url] = {
+    def _with_live_stats(self, stats: Dict[str, Any]) -> Dict[str, Any]:
+        """Restore the decaying success and latency averages, seeding them from stored counters if unset"""
+        success_count = stats.get('success_count') or 0
+        total = success_count + (stats.get('failure_count') or 0)
+        if stats.get('success_ewma') is None:
+            stats['success_ewma'] = success_count / total if total else 0.5
+        if stats.get('latency_ewma') is None:
+            stats['latency_ewma'] = stats.get('avg_response_time') or 1.0
+        stats['consecutive_failures'] = stats.get('consecutive_failures') or 0
+        return stats
+    
+    def flush_health(self):
+        """Persist the live health of every proxy that changed since the last flush, in one transaction"""
+        if not self.dirty:
+            return
+        now, wall_now = time.monotonic(), time.time()
+        health = []
+        for proxy_url in self.dirty:
+            if proxy_url not in self.proxy_stats:
+                continue
+            stats = self.proxy_stats[proxy_url]
+            entry = self.quarantine.get(proxy_url)
+            checked = self.last_checked.get(proxy_url)
+            health.append((
+                stats['success_ewma'],
+                stats['latency_ewma'],
+                stats.get('consecutive_failures', 0),
+                entry['level'] if entry else None,
+                wall_now + (entry['retest_at'] - now) if entry else None,
+                wall_now - (now - checked) if checked is not None else None,
+                proxy_url
+            ))
+        self.dirty.clear()
+        self.db_manager.update_proxy_health(health)
+    
+    def _get_stats(self, proxy_url: str) -> Dict[str, Any]:
+        """Get a proxy's live statistics, creating empty ones for a new proxy"""
+        if proxy_url not in self.proxy_stats:
+            self.proxy_stats[proxy_url] = self._with_live_stats({
                 'success_count': 0,
                 'failure_count': 0,
                 'avg_response_time': 0.0,
                 'is_active': True
-            }
+            })
+        return self.proxy_stats[proxy_url]
+    
+    def _proxy_weight(self, proxy_url: str) -> float:
+        """Get a proxy's selection weight: recent success rate favoured over latency"""
+        if proxy_url in self.failed_proxies:
+            return 0.0
+        stats = self._get_stats(proxy_url)
+        return max(Config.PROXY_MIN_WEIGHT, stats['success_ewma'] ** 2 / (1.0 + stats['latency_ewma']))
+    
+    @staticmethod
+    def parse_proxy_list(text: str) -> Tuple[List[str], List[str]]:
+        """Parse a proxy list (one per line, '#' comments) into unique proxy URLs and invalid lines.
+
+        A bare host:port is taken as an HTTP proxy.
+        """
+        proxies, invalid, seen = [], [], set()
+        for line in text.splitlines():
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            proxy_url = line if '://' in line else f"http://{line}"
+            try:
+                parsed = urlparse(proxy_url)
+                valid = parsed.scheme in ('http', 'https', 'socks4', 'socks5') and parsed.hostname and parsed.port
+            except ValueError:
+                valid = False
+            if not valid:
+                invalid.append(line)
+            elif proxy_url not in seen:
+                seen.add(proxy_url)
+                proxies.append(proxy_url)
+        return proxies, invalid
+    
+    def add_proxy(self, proxy_url: str) -> bool:
+        """Add a proxy to the list"""
+        if proxy_url not in self.proxies:
+            self.proxies.append(proxy_url)
+            self.weights.add(proxy_url, self._proxy_weight(proxy_url))
+            self.db_manager.set_proxy_in_pool(proxy_url, True)
             return True
         return False
     
@@ -67,71 +534,157 @@ class EnhancedProxyManager:
         """Remove a proxy from the list"""
         if proxy_url in self.proxies:
             self.proxies.remove(proxy_url)
+            self.weights.remove(proxy_url)
             if proxy_url in self.failed_proxies:
                 self.failed_proxies.remove(proxy_url)
+            self.quarantine.pop(proxy_url, None)
+            self.last_checked.pop(proxy_url, None)
+            self.dirty.discard(proxy_url)
             if proxy_url in self.proxy_stats:
                 del self.proxy_stats[proxy_url]
+            self.db_manager.set_proxy_in_pool(proxy_url, False)
             return True
         return False
     
     def get_next_proxy(self) -> Optional[str]:
-        """Get the next working proxy in rotation with health-based selection"""
+        """Get a working proxy, picked at random in proportion to its live health.
+
+        Returns None (a direct request) while every proxy is quarantined; the health
+        checker brings them back as they pass their re-tests.
+        """
         if not self.proxies:
             return None
-        
-        # Filter out failed proxies
-        working_proxies = [p for p in self.proxies if p not in self.failed_proxies]
-        if not working_proxies:
-            # Reset failed proxies if all are failed
-            self.failed_proxies.clear()
-            working_proxies = self.proxies
-        
-        # Sort by success rate and response time
-        def proxy_score(proxy):
-            stats = self.proxy_stats.get(proxy, {})
-            success_count = stats.get('success_count', 0)
-            failure_count = stats.get('failure_count', 0)
-            total_requests = success_count + failure_count
-            
-            if total_requests == 0:
-                return 0.5  # Neutral score for untested proxies
-            
-            success_rate = success_count / total_requests
-            avg_response_time = stats.get('avg_response_time', 1.0)
-            
-            # Higher score for better success rate and lower response time
-            return success_rate - (avg_response_time / 10.0)
-        
-        working_proxies.sort(key=proxy_score, reverse=True)
-        
-        if self.current_proxy_index >= len(working_proxies):
-            self.current_proxy_index = 0
-        
-        proxy = working_proxies[self.current_proxy_index]
-        self.current_proxy_index += 1
-        return proxy
+        return self.weights.sample()
     
-    def mark_proxy_failed(self, proxy_url: str):
-        """Mark a proxy as failed"""
+    def _refresh_weight(self, proxy_url: str):
+        """Push a proxy's current weight into the selection tree"""
+        if proxy_url in self.weights:
+            self.weights.update(proxy_url, self._proxy_weight(proxy_url))
+            self.dirty.add(proxy_url)
+    
+    def _quarantine(self, proxy_url: str):
+        """Take a proxy out of rotation, re-testing it later (exponentially later if it keeps failing)"""
+        entry = self.quarantine.get(proxy_url)
+        level = entry['level'] + 1 if entry else 0
+        delay = min(Config.PROXY_MAX_RETEST_DELAY, Config.PROXY_RETRY_DELAY * (2 ** level))
+        self.quarantine[proxy_url] = {'level': level, 'retest_at': time.monotonic() + delay}
         self.failed_proxies.add(proxy_url)
+        self._refresh_weight(proxy_url)
+        if not entry:
+            logger.warning(f"Proxy {proxy_url} quarantined, re-testing in {delay:.0f}s")
+    
+    def _release(self, proxy_url: str):
+        """Put a recovered proxy back into rotation"""
+        if self.quarantine.pop(proxy_url, None) is not None:
+            logger.info(f"Proxy {proxy_url} passed its re-test, back in rotation")
+        self.failed_proxies.discard(proxy_url)
+        self._get_stats(proxy_url)['consecutive_failures'] = 0
+        self._refresh_weight(proxy_url)
+    
+    def mark_proxy_failed(self, proxy_url: str):
+        """Mark a proxy as failed, quarantining it after MAX_PROXY_FAILURES in a row"""
+        stats = self._get_stats(proxy_url)
+        stats['failure_count'] = (stats.get('failure_count') or 0) + 1
+        stats['consecutive_failures'] = stats.get('consecutive_failures', 0) + 1
+        stats['success_ewma'] *= 1 - Config.PROXY_STATS_ALPHA
+        if stats['consecutive_failures'] >= Config.MAX_PROXY_FAILURES and proxy_url not in self.quarantine:
+            self._quarantine(proxy_url)
+        self._refresh_weight(proxy_url)
         self.db_manager.update_proxy_stats(proxy_url, False)
     
     def mark_proxy_success(self, proxy_url: str, response_time: float):
         """Mark a proxy as successful"""
-        if proxy_url in self.failed_proxies:
-            self.failed_proxies.remove(proxy_url)
+        stats = self._get_stats(proxy_url)
+        success_count = stats.get('success_count') or 0
+        stats['avg_response_time'] = ((stats.get('avg_response_time') or 0.0) * success_count + response_time) / (success_count + 1)
+        stats['success_count'] = success_count + 1
+        stats['success_ewma'] += Config.PROXY_STATS_ALPHA * (1.0 - stats['success_ewma'])
+        stats['latency_ewma'] += Config.PROXY_STATS_ALPHA * (response_time - stats['latency_ewma'])
+        # Real traffic through the proxy counts as a passed health check
+        self.last_checked[proxy_url] = time.monotonic()
+        self._release(proxy_url)
         self.db_manager.update_proxy_stats(proxy_url, True, response_time)
     
+    def get_due_health_checks(self) -> List[str]:
+        """Get the quarantined proxies due for a re-test and the active ones not checked lately"""
+        now = time.monotonic()
+        due = []
+        for proxy_url in self.proxies:
+            entry = self.quarantine.get(proxy_url)
+            if entry:
+                if now >= entry['retest_at']:
+                    due.append(proxy_url)
+            elif now - self.last_checked.get(proxy_url, float('-inf')) >= Config.PROXY_HEALTH_CHECK_INTERVAL:
+                due.append(proxy_url)
+        return due
+    
+    def record_health_check(self, proxy_url: str, success: bool):
+        """Promote a proxy that passed a health check, (re-)quarantine one that failed"""
+        if proxy_url not in self.proxies:
+            return  # removed while being tested
+        self.last_checked[proxy_url] = time.monotonic()
+        self.dirty.add(proxy_url)
+        if success:
+            self._release(proxy_url)
+        else:
+            self._quarantine(proxy_url)
+    
+    async def run_health_checks(self, api_client: APIClient) -> int:
+        """Test every due proxy concurrently, at most PROXY_HEALTH_CHECK_CONCURRENCY at a time"""
+        due = self.get_due_health_checks()
+        if not due:
+            return 0
+        
+        semaphore = asyncio.Semaphore(Config.PROXY_HEALTH_CHECK_CONCURRENCY)
+        
+        async def check(proxy_url: str):
+            async with semaphore:
+                response = await api_client.test_proxy(proxy_url)
+            self.record_health_check(proxy_url, response.success)
+        
+        await asyncio.gather(*(check(proxy_url) for proxy_url in due), return_exceptions=True)
+        return len(due)
+    
+    async def import_proxies(self, proxy_urls: List[str], api_client: APIClient,
+                             progress: Optional[Callable[[Dict[str, int]], Awaitable[None]]] = None) -> Dict[str, int]:
+        """Validate new proxies concurrently against PROXY_TEST_URL and add the ones that pass"""
+        existing = set(self.proxies)
+        candidates = [proxy_url for proxy_url in proxy_urls if proxy_url not in existing]
+        result = {'total': len(candidates), 'checked': 0, 'passed': 0, 'failed': 0,
+                  'duplicates': len(proxy_urls) - len(candidates)}
+        semaphore = asyncio.Semaphore(Config.PROXY_IMPORT_CONCURRENCY)
+        
+        async def validate(proxy_url: str):
+            async with semaphore:
+                response = await api_client.test_proxy(proxy_url)
+            result['checked'] += 1
+            if response.success and self.add_proxy(proxy_url):
+                self.mark_proxy_success(proxy_url, response.response_time or 0.0)
+                result['passed'] += 1
+            else:
+                result['failed'] += 1
+            if progress:
+                try:
+                    await progress(result)
+                except Exception as e:
+                    logger.error(f"Error reporting proxy import progress: {e}")
+        
+        await asyncio.gather(*(validate(proxy_url) for proxy_url in candidates), return_exceptions=True)
+        logger.info(f"Imported {result['passed']} of {result['total']} new proxies")
+        return result
+    
     def list_proxies(self) -> List[Dict[str, Any]]:
         """List all proxies with their status and statistics"""
         result = []
         for proxy in self.proxies:
             stats = self.proxy_stats.get(proxy, {})
             is_failed = proxy in self.failed_proxies
+            entry = self.quarantine.get(proxy)
             
             result.append({
                 'proxy': proxy,
                 'status': 'Failed' if is_failed else 'Active',
+                'retest_in': max(0.0, entry['retest_at'] - time.monotonic()) if entry else None,
                 'success_count': stats.get('success_count', 0),
                 'failure_count': stats.get('failure_count', 0),
                 'avg_response_time': stats.get('avg_response_time', 0.0),
@@ -154,14 +707,19 @@ class EnhancedProxyManager:
 class EnhancedInstagramMonitor:
     """Enhanced Instagram monitor with better error handling and statistics"""
     
-    def __init__(self, db_manager: EnhancedDatabaseManager):
-        self.monitoring_tasks = {}
+    def __init__(self, db_manager: EnhancedDatabaseManager, api_client: Optional[APIClient] = None):
+        self.registry = MonitorRegistry()
+        self.alert_dispatcher = AlertDispatcher()
         self.db_manager = db_manager
         self.proxy_manager = EnhancedProxyManager(db_manager)
-        self.sequential_monitor_task = None
-        self.monitor_queue = []
-        self.is_sequential_running = False
-        self.api_client = None
+        self.monitor_task = None
+        self.worker_tasks = []
+        self.proxy_health_task = None
+        self.work_queue: Optional[asyncio.Queue] = None
+        self.is_monitor_running = False
+        # A client passed in is owned (and closed) by the caller
+        self.api_client = api_client
+        self._owns_api_client = api_client is None
         self.stats = {
             'total_checks': 0,
             'successful_checks': 0,
@@ -169,19 +727,21 @@ class EnhancedInstagramMonitor:
             'bans_detected': 0,
             'unbans_detected': 0,
             'proxy_errors': 0,
-            'api_errors': 0
+            'api_errors': 0,
+            'full_fetches': 0  # checks that pulled the full profile rather than a probe
         }
     
     async def _get_api_client(self) -> APIClient:
-        """Get or create API client"""
+        """Get the shared API client, creating an owned one if none was given"""
         if self.api_client is None:
             self.api_client = APIClient()
+            self._owns_api_client = True
             await self.api_client._create_session()
         return self.api_client
     
     async def _close_api_client(self):
-        """Close API client"""
-        if self.api_client:
+        """Close API client if this monitor owns it"""
+        if self.api_client and self._owns_api_client:
             await self.api_client._close_session()
             self.api_client = None
     
@@ -226,44 +786,121 @@ class EnhancedInstagramMonitor:
         except Exception:
             return 'Unknown'
     
+    def _start_engine(self):
+        """Start the configured monitor engine"""
+        self.is_monitor_running = True
+        self.alert_dispatcher.start()
+        self.start_proxy_health_checks()
+        if Config.MONITOR_ENGINE == 'sequential':
+            self.monitor_task = asyncio.create_task(self.sequential_monitor_loop())
+        else:
+            self.monitor_task = asyncio.create_task(self.concurrent_monitor_loop())
+
+    def start_proxy_health_checks(self):
+        """Start the background proxy health checker if it is not running"""
+        if self.proxy_health_task is None or self.proxy_health_task.done():
+            self.proxy_health_task = asyncio.create_task(self.proxy_health_loop())
+
+    async def proxy_health_loop(self):
+        """Re-test proxies in the background so checks only go through proxies that work"""
+        while True:
+            try:
+                if self.proxy_manager.proxies:
+                    api_client = await self._get_api_client()
+                    await self.proxy_manager.run_health_checks(api_client)
+                self.proxy_manager.flush_health()
+            except Exception as e:
+                logger.error(f"Proxy health check error: {e}")
+            await asyncio.sleep(Config.PROXY_HEALTH_CHECK_TICK)
+
+    async def _check_monitor(self, monitor_data: MonitorData):
+        """Run a single check, evicting the monitor after too many consecutive errors"""
+        try:
+            await self._process_monitor_data(monitor_data)
+        except Exception as e:
+            logger.error(f"Error processing monitor data for {monitor_data.username}: {e}")
+            monitor_data.consecutive_errors += 1
+
+            # Remove from queue if too many consecutive errors, ending its sessions so it is not restored
+            if monitor_data.consecutive_errors >= Config.MAX_CONSECUTIVE_ERRORS:
+                logger.warning(f"Removing {monitor_data.username} due to consecutive errors")
+                for subscriber in monitor_data.subscribers:
+                    if subscriber.session_id:
+                        self.db_manager.end_monitoring_session(subscriber.session_id, 'error')
+                self.registry.remove(monitor_data)
+
+    def _next_check_delay(self, monitor_data: MonitorData) -> float:
+        """Get the delay until a monitor's next check (sooner when a failed check is retried)"""
+        if monitor_data.retry_delay is not None:
+            delay, monitor_data.retry_delay = monitor_data.retry_delay, None
+            return delay
+        return random.uniform(*(monitor_data.check_interval or Config.MONITOR_CHECK_INTERVAL))
+
+    def _reschedule(self, monitor_data: MonitorData):
+        """Schedule the next check for a monitor that is still registered"""
+        self.registry.reschedule(monitor_data, time.monotonic() + self._next_check_delay(monitor_data))
+
     async def sequential_monitor_loop(self):
         """Enhanced sequential monitoring loop with better error handling"""
         logger.info("Starting enhanced sequential monitor loop")
         
-        while self.is_sequential_running:
+        while self.is_monitor_running:
             try:
-                if not self.monitor_queue:
-                    await asyncio.sleep(30)
-                    continue
+                monitor_data = await self.registry.pop_due()
+                await self._check_monitor(monitor_data)
+                self._reschedule(monitor_data)
 
-                # Process each account in the queue
-                for monitor_data in self.monitor_queue.copy():
-                    try:
-                        await self._process_monitor_data(monitor_data)
-                    except Exception as e:
-                        logger.error(f"Error processing monitor data for {monitor_data.username}: {e}")
-                        monitor_data.consecutive_errors += 1
-                        
-                        # Remove from queue if too many consecutive errors
-                        if monitor_data.consecutive_errors >= Config.MAX_CONSECUTIVE_ERRORS:
-                            logger.warning(f"Removing {monitor_data.username} due to consecutive errors")
-                            self.monitor_queue.remove(monitor_data)
-                            if monitor_data.username in self.monitoring_tasks:
-                                del self.monitoring_tasks[monitor_data.username]
-
-                # Wait before next round of checks
-                await asyncio.sleep(random.uniform(*Config.MONITOR_CHECK_INTERVAL))
+                # Add delay between account checks to avoid API rate limiting
+                await asyncio.sleep(random.uniform(*Config.MONITOR_ACCOUNT_DELAY))
 
             except Exception as e:
                 logger.error(f"Sequential monitoring error: {e}")
                 await asyncio.sleep(60)
+
+    async def _monitor_worker(self, worker_id: int):
+        """Worker pulling monitor checks from the shared work queue"""
+        while True:
+            monitor_data = await self.work_queue.get()
+            try:
+                if self.registry.is_active(monitor_data):
+                    await self._check_monitor(monitor_data)
+                    self._reschedule(monitor_data)
+            finally:
+                self.work_queue.task_done()
+
+    async def concurrent_monitor_loop(self):
+        """Concurrent monitoring loop dispatching due checks to a bounded pool of workers.
+
+        Each monitor has its own next-due time in the scheduler, and pacing comes
+        from the API client's rate limiter rather than per-account sleeps.
+        """
+        worker_count = max(1, Config.MAX_CONCURRENT_MONITORS)
+        logger.info(f"Starting concurrent monitor loop with {worker_count} workers")
+
+        # Bounded so due checks wait in the scheduler while every worker is busy
+        self.work_queue = asyncio.Queue(maxsize=worker_count)
+        self.worker_tasks = [
+            asyncio.create_task(self._monitor_worker(i)) for i in range(worker_count)
+        ]
+
+        try:
+            while self.is_monitor_running:
+                try:
+                    monitor_data = await self.registry.pop_due()
+                    await self.work_queue.put(monitor_data)
+
+                except Exception as e:
+                    logger.error(f"Concurrent monitoring error: {e}")
+                    await asyncio.sleep(60)
+        finally:
+            for task in self.worker_tasks:
+                task.cancel()
+            self.worker_tasks = []
     
     async def _process_monitor_data(self, monitor_data: MonitorData):
         """Process a single monitor data entry"""
         username = monitor_data.username
-        monitor_type = monitor_data.type
-        send_func = monitor_data.send_func
-        start_time = monitor_data.start_time
+        monitor_type = monitor_data.monitor_type
         is_banned_state = monitor_data.is_banned_state
         check_count = monitor_data.check_count
         last_known_data = monitor_data.last_known_data
@@ -271,26 +908,32 @@ class EnhancedInstagramMonitor:
         # Get proxy for this check
         proxy_url = self.proxy_manager.get_next_proxy()
         
-        # Check account status
+        # Check account status; routine checks only probe existence
+        probe = Config.MONITOR_PROBE_CHECKS and not self._needs_full_profile(monitor_data)
+        retry = not Config.MONITOR_NONBLOCKING_RETRIES
         api_client = await self._get_api_client()
-        user_data_response = await api_client.get_instagram_profile(username, proxy_url)
+        user_data_response = await api_client.get_instagram_profile(username, proxy_url, probe=probe, retry=retry)
+        
+        # A coalesced response may have come through another caller's proxy; only
+        # credit or blame our proxy for a response that actually went through it
+        own_proxy = proxy_url if proxy_url and user_data_response.proxy_used == proxy_url else None
         
         # Update statistics
         self.stats['total_checks'] += 1
         if user_data_response.success:
             self.stats['successful_checks'] += 1
-            if proxy_url:
-                self.proxy_manager.mark_proxy_success(proxy_url, user_data_response.response_time)
+            if own_proxy:
+                self.proxy_manager.mark_proxy_success(own_proxy, user_data_response.response_time)
         else:
             self.stats['failed_checks'] += 1
-            if user_data_response.status_code == 403 and proxy_url:
+            if user_data_response.status_code == 403 and own_proxy:
                 # Treat 403 via proxy as proxy failure and retry next loop
                 self.stats['proxy_errors'] += 1
-                self.proxy_manager.mark_proxy_failed(proxy_url)
+                self.proxy_manager.mark_proxy_failed(own_proxy)
             elif user_data_response.error and 'proxy' in (user_data_response.error or '').lower():
                 self.stats['proxy_errors'] += 1
-                if proxy_url:
-                    self.proxy_manager.mark_proxy_failed(proxy_url)
+                if own_proxy:
+                    self.proxy_manager.mark_proxy_failed(own_proxy)
             else:
                 self.stats['api_errors'] += 1
         
@@ -307,21 +950,36 @@ class EnhancedInstagramMonitor:
             user_data_response.error
         )
         
-        # Update session check count
-        if monitor_data.session_id:
-            self.db_manager.update_session_check_count(monitor_data.session_id, monitor_data.check_count)
-        
         # Handle proxy errors
         if (user_data_response.status_code == 403 or user_data_response.data.get('st') == 'proxy_error') and proxy_url:
             logger.warning(f"Proxy failed for {username}, trying without proxy")
-            user_data_response = await api_client.get_instagram_profile(username)
+            user_data_response = await api_client.get_instagram_profile(username, probe=probe, retry=retry)
             if user_data_response.success:
                 self.stats['successful_checks'] += 1
                 self.stats['proxy_errors'] -= 1  # Adjust count since we recovered
 
+        # A probe saying a banned account is back is confirmed by a full fetch, which also
+        # supplies the profile for the unban alert (a 'not_found' probe is already authoritative)
+        if user_data_response.probe and is_banned_state:
+            self.stats['full_fetches'] += 1
+            full_response = await api_client.get_instagram_profile(username, user_data_response.proxy_used, retry=retry)
+            if full_response.data.get('st') in ('ok', 'not_found'):
+                user_data_response = full_response
+        elif not probe:
+            self.stats['full_fetches'] += 1
+
+        # Retry a transient failure soon, with backoff, rather than at the next regular check
+        if user_data_response.retry_after is not None and monitor_data.retry_attempt < Config.API_RETRY_ATTEMPTS - 1:
+            monitor_data.retry_delay = user_data_response.retry_after * (2 ** monitor_data.retry_attempt)
+            monitor_data.retry_attempt += 1
+        else:
+            monitor_data.retry_attempt = 0
+
         # Store last known good data
         if user_data_response.data.get('st') == 'ok':
-            monitor_data.last_known_data = user_data_response.data
+            if not user_data_response.probe:
+                monitor_data.last_known_data = user_data_response.data
+                monitor_data.last_full_fetch = datetime.now()
             monitor_data.consecutive_errors = 0  # Reset error count on success
 
         current_status = user_data_response.data.get('st')
@@ -330,80 +988,216 @@ class EnhancedInstagramMonitor:
         # State change detection
         if currently_banned and not is_banned_state:
             monitor_data.is_banned_state = True
-            if monitor_type == 'ban':
-                self.stats['bans_detected'] += 1
-                detection_time = datetime.now()
-                elapsed_time = detection_time - start_time
-                await self.send_ban_alert(username, last_known_data or user_data_response.data, 
-                                        send_func, monitor_data.check_count, elapsed_time, 
-                                        start_time, detection_time)
-                # Remove from queue
-                self.monitor_queue.remove(monitor_data)
-                if monitor_data.session_id:
-                    self.db_manager.end_monitoring_session(monitor_data.session_id, 'completed')
-                return
+            self.stats['bans_detected'] += 1
+            detection_time = datetime.now()
+            user_data = last_known_data or user_data_response.data
+            self.db_manager.log_event(username, 'banned', 'banned', user_data)
+            for subscriber in self._complete_subscribers(monitor_data, 'ban'):
+                try:
+                    await self.send_ban_alert(username, user_data, subscriber.send_func,
+                                            monitor_data.check_count - subscriber.start_check_count,
+                                            detection_time - subscriber.start_time,
+                                            subscriber.start_time, detection_time, subscriber.channel_id)
+                except Exception as e:
+                    logger.error(f"Error queueing ban alert for {username} to {subscriber.channel_id}: {e}")
 
         elif not currently_banned and is_banned_state:
             monitor_data.is_banned_state = False
-            if monitor_type == 'unban':
-                self.stats['unbans_detected'] += 1
-                detection_time = datetime.now()
-                elapsed_time = detection_time - start_time
-                await self.send_unban_alert(username, user_data_response.data, send_func, 
-                                          monitor_data.check_count, elapsed_time, start_time, detection_time)
-                # Remove from queue
-                self.monitor_queue.remove(monitor_data)
-                if monitor_data.session_id:
-                    self.db_manager.end_monitoring_session(monitor_data.session_id, 'completed')
-                return
+            self.stats['unbans_detected'] += 1
+            detection_time = datetime.now()
+            self.db_manager.log_event(username, 'unbanned', 'recovered', user_data_response.data)
+            for subscriber in self._complete_subscribers(monitor_data, 'unban'):
+                try:
+                    await self.send_unban_alert(username, user_data_response.data, subscriber.send_func,
+                                              monitor_data.check_count - subscriber.start_check_count,
+                                              detection_time - subscriber.start_time,
+                                              subscriber.start_time, detection_time, subscriber.channel_id)
+                except Exception as e:
+                    logger.error(f"Error queueing unban alert for {username} to {subscriber.channel_id}: {e}")
+
+        self._persist_monitor_state(monitor_data)
 
-        # Add delay between account checks to avoid API rate limiting
-        await asyncio.sleep(random.uniform(*Config.MONITOR_ACCOUNT_DELAY))
+    def _needs_full_profile(self, monitor_data: MonitorData) -> bool:
+        """Check whether an account's last full profile is missing or too old to alert with"""
+        if monitor_data.is_banned_state:
+            return False  # banned accounts have no profile to fetch; a probe 'ok' triggers the full fetch
+        if monitor_data.last_known_data is None or monitor_data.last_full_fetch is None:
+            return True
+        return (datetime.now() - monitor_data.last_full_fetch).total_seconds() > Config.MONITOR_FULL_PROFILE_MAX_AGE
+
+    def _persist_monitor_state(self, monitor_data: MonitorData):
+        """Save check counts and polled state to the remaining subscribers' sessions"""
+        check_counts = [
+            (subscriber.session_id, monitor_data.check_count - subscriber.start_check_count)
+            for subscriber in monitor_data.subscribers if subscriber.session_id
+        ]
+        if check_counts:
+            self.db_manager.update_sessions_state(
+                check_counts, monitor_data.is_banned_state, monitor_data.last_known_data
+            )
+
+    def _complete_subscribers(self, monitor_data: MonitorData, monitor_type: str) -> List[MonitorSubscriber]:
+        """Detach the subscribers waiting on this transition, ending the monitor once none are left"""
+        completed = [s for s in monitor_data.subscribers if s.monitor_type == monitor_type]
+        if not completed:
+            return []
+        
+        monitor_data.subscribers = [s for s in monitor_data.subscribers if s.monitor_type != monitor_type]
+        for subscriber in completed:
+            if subscriber.session_id:
+                self.db_manager.end_monitoring_session(subscriber.session_id, 'completed')
+        
+        if not monitor_data.subscribers:
+            self.registry.remove(monitor_data)
+        return completed
 
     async def start_monitoring(self, username: str, monitor_type: str, send_func: Callable, 
-                             current_status: str, user_id: int) -> bool:
-        """Add account to sequential monitoring queue with enhanced tracking"""
-        if not self.is_sequential_running:
-            self.is_sequential_running = True
-            self.sequential_monitor_task = asyncio.create_task(self.sequential_monitor_loop())
+                             current_status: str, user_id: int, channel_id: Optional[int] = None,
+                             check_interval: Optional[Tuple[float, float]] = None) -> bool:
+        """Subscribe a channel to an account, polling each account only once"""
+        if not self.is_monitor_running:
+            self._start_engine()
+
+        channel_id = channel_id if channel_id is not None else user_id
+        monitor_data = self.registry.get(username)
+        if monitor_data and monitor_data.get_subscriber(channel_id, monitor_type):
+            return False
 
         # Start monitoring session in database
-        session_id = self.db_manager.start_monitoring_session(username, monitor_type, user_id)
-        
-        monitor_data = MonitorData(
-            username=username,
+        session_id = self.db_manager.start_monitoring_session(
+            username, monitor_type, user_id, channel_id, current_status == 'not_found'
+        )
+
+        if monitor_data is None:
+            monitor_data = MonitorData(
+                username=username,
+                start_time=datetime.now(),
+                is_banned_state=(current_status == 'not_found'),
+                check_interval=check_interval
+            )
+            self.registry.add(monitor_data)
+
+        monitor_data.subscribers.append(MonitorSubscriber(
+            channel_id=channel_id,
             monitor_type=monitor_type,
             send_func=send_func,
             start_time=datetime.now(),
-            is_banned_state=(monitor_type == 'unban'),
-            session_id=session_id
-        )
-
-        self.monitor_queue.append(monitor_data)
-        self.monitoring_tasks[username] = monitor_data
+            user_id=user_id,
+            session_id=session_id,
+            start_check_count=monitor_data.check_count
+        ))
         
-        logger.info(f"Started monitoring {username} for {monitor_type} (session: {session_id})")
+        logger.info(f"Started monitoring {username} for {monitor_type} in {channel_id} "
+                    f"(session: {session_id}, subscribers: {len(monitor_data.subscribers)})")
         return True
 
-    def stop_monitoring(self, username: str) -> bool:
-        """Remove account from monitoring queue"""
-        if username in self.monitoring_tasks:
-            monitor_data = self.monitoring_tasks[username]
-            if monitor_data in self.monitor_queue:
-                self.monitor_queue.remove(monitor_data)
-            
-            # End monitoring session
-            if monitor_data.session_id:
-                self.db_manager.end_monitoring_session(monitor_data.session_id, 'stopped')
-            
-            del self.monitoring_tasks[username]
-            logger.info(f"Stopped monitoring {username}")
-            return True
-        return False
+    async def restore_monitors(self, send_func_factory: Callable[[int], Awaitable[Optional[Callable]]]) -> int:
+        """Rehydrate monitors from active sessions, spreading their first checks over the interval.
+
+        ``send_func_factory`` resolves a stored channel id to a send function, or None when
+        the channel is gone, in which case the session is closed as orphaned.
+        """
+        sessions = self.db_manager.get_active_sessions()
+        if not sessions:
+            return 0
+
+        by_username: Dict[str, List[Dict[str, Any]]] = {}
+        for session in sessions:
+            by_username.setdefault(MonitorRegistry.normalize(session['username']), []).append(session)
+
+        restored = 0
+        for rows in by_username.values():
+            subscribers = []
+            for row in rows:
+                send_func = await send_func_factory(row['channel_id']) if row['channel_id'] else None
+                if send_func is None:
+                    self.db_manager.end_monitoring_session(row['id'], 'orphaned')
+                    continue
+                subscribers.append((row, send_func))
+
+            if not subscribers or rows[0]['username'] in self.registry:
+                continue
+
+            # Rows are newest first, so the first one carries the latest polled state
+            latest = subscribers[0][0]
+            check_count = max(row['check_count'] or 0 for row, _ in subscribers)
+            start_times = [self._parse_session_time(row['started_at']) for row, _ in subscribers]
+            monitor_data = MonitorData(
+                username=latest['username'],
+                start_time=min(start_times),
+                is_banned_state=latest['is_banned_state'],
+                check_count=check_count,
+                last_known_data=next((row['last_known_data'] for row, _ in subscribers if row['last_known_data']), None)
+            )
+            for (row, send_func), start_time in zip(subscribers, start_times):
+                monitor_data.subscribers.append(MonitorSubscriber(
+                    channel_id=row['channel_id'],
+                    monitor_type=row['monitor_type'],
+                    send_func=send_func,
+                    start_time=start_time,
+                    user_id=row['user_id'] or 0,
+                    session_id=row['id'],
+                    start_check_count=check_count - (row['check_count'] or 0)
+                ))
+            restored += 1
+
+            # Spread the first checks so restored accounts do not all fire at once
+            offset = Config.MONITOR_CHECK_INTERVAL[0] * (restored - 1) / len(by_username)
+            self.registry.add(monitor_data, time.monotonic() + offset)
+
+        if restored and not self.is_monitor_running:
+            self._start_engine()
+
+        logger.info(f"Restored {restored} monitors from {len(sessions)} active sessions")
+        return restored
+
+    def _parse_session_time(self, value: Any) -> datetime:
+        """Parse a stored session timestamp, falling back to now"""
+        if isinstance(value, datetime):
+            return value
+        try:
+            return datetime.fromisoformat(str(value))
+        except (TypeError, ValueError):
+            return datetime.now()
+
+    def is_subscribed(self, username: str, channel_id: int, monitor_type: str) -> bool:
+        """Check whether a channel already has this subscription"""
+        monitor_data = self.registry.get(username)
+        return bool(monitor_data and monitor_data.get_subscriber(channel_id, monitor_type))
+
+    def get_known_status(self, username: str) -> Optional[str]:
+        """Get the last polled status of a monitored account, if it has been checked"""
+        monitor_data = self.registry.get(username)
+        if not monitor_data or monitor_data.last_check_time is None:
+            return None
+        return 'not_found' if monitor_data.is_banned_state else 'ok'
+
+    def stop_monitoring(self, username: str, channel_id: Optional[int] = None) -> bool:
+        """Remove a channel's subscriptions to an account (all subscriptions if no channel given)"""
+        monitor_data = self.registry.get(username)
+        if not monitor_data:
+            return False
+        
+        stopped = [s for s in monitor_data.subscribers if channel_id is None or s.channel_id == channel_id]
+        if not stopped:
+            return False
+        
+        monitor_data.subscribers = [s for s in monitor_data.subscribers if s not in stopped]
+        
+        # End monitoring sessions
+        for subscriber in stopped:
+            if subscriber.session_id:
+                self.db_manager.end_monitoring_session(subscriber.session_id, 'stopped')
+        
+        if not monitor_data.subscribers:
+            self.registry.remove(monitor_data)
+        
+        logger.info(f"Stopped monitoring {username} ({len(stopped)} subscriptions)")
+        return True
 
     async def send_ban_alert(self, username: str, user_data: dict, send_func: Callable, 
-                           check_count: int, elapsed_time, start_time, detection_time):
-        """Send enhanced ban alert with better formatting"""
+                           check_count: int, elapsed_time, start_time, detection_time, channel_id: int = 0):
+        """Queue enhanced ban alert with better formatting"""
         ban_gif = random.choice(Config.BAN_GIF_URLS)
         ban_message = random.choice(Config.BAN_MESSAGES)
 
@@ -447,12 +1241,11 @@ class EnhancedInstagramMonitor:
             icon_url="https://upload.wikimedia.org/wikipedia/commons/thumb/a/a5/Instagram_icon.png/600px-Instagram_icon.png"
         )
 
-        await send_func(embed=embed)
-        self.db_manager.log_event(username, 'banned', 'banned', user_data)
+        await self.alert_dispatcher.enqueue(channel_id, send_func, embed, username)
 
     async def send_unban_alert(self, username: str, user_data: dict, send_func: Callable, 
-                             check_count: int, elapsed_time, start_time, detection_time):
-        """Send enhanced unban alert with better formatting"""
+                             check_count: int, elapsed_time, start_time, detection_time, channel_id: int = 0):
+        """Queue enhanced unban alert with better formatting"""
         unban_gif = random.choice(Config.UNBAN_GIF_URLS)
         unban_message = random.choice(Config.UNBAN_MESSAGES)
 
@@ -496,23 +1289,33 @@ class EnhancedInstagramMonitor:
             icon_url="https://upload.wikimedia.org/wikipedia/commons/thumb/a/a5/Instagram_icon.png/600px-Instagram_icon.png"
         )
 
-        await send_func(embed=embed)
-        self.db_manager.log_event(username, 'unbanned', 'recovered', user_data)
+        await self.alert_dispatcher.enqueue(channel_id, send_func, embed, username)
 
     def get_monitoring_stats(self) -> Dict[str, Any]:
         """Get monitoring statistics"""
         return {
             **self.stats,
-            'active_monitors': len(self.monitoring_tasks),
-            'queue_size': len(self.monitor_queue),
+            'active_monitors': len(self.registry),
+            'subscribers': sum(len(m.subscribers) for m in self.registry),
+            'queue_size': len(self.registry),
+            'scheduled_checks': len(self.registry.scheduler),
+            'engine': Config.MONITOR_ENGINE,
+            'pending_checks': self.work_queue.qsize() if self.work_queue else 0,
             'proxy_count': len(self.proxy_manager.proxies),
-            'failed_proxies': len(self.proxy_manager.failed_proxies)
+            'failed_proxies': len(self.proxy_manager.failed_proxies),
+            'alerts': self.alert_dispatcher.get_stats()
         }
 
     async def cleanup(self):
         """Cleanup resources"""
-        self.is_sequential_running = False
-        if self.sequential_monitor_task:
-            self.sequential_monitor_task.cancel()
+        self.is_monitor_running = False
+        if self.monitor_task:
+            self.monitor_task.cancel()
+        for task in self.worker_tasks:
+            task.cancel()
+        if self.proxy_health_task:
+            self.proxy_health_task.cancel()
+        self.proxy_manager.flush_health()
+        await self.alert_dispatcher.close()
         await self._close_api_client()
         self.db_manager.close()